@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "src.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -76,6 +77,21 @@ DATABASES = {
     'default': dj_database_url.config(default=os.getenv('DATABASE_URL'))
 }
 
+# Read replicas for list endpoints, e.g. REPLICA_DATABASE_URLS="postgres://replica1/db sqlite:///replica.sqlite3"
+REPLICA_DATABASES = []
+for i, url in enumerate(os.getenv('REPLICA_DATABASE_URLS', '').split()):
+    alias = f'replica_{i}'
+    DATABASES[alias] = dj_database_url.parse(url)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    REPLICA_DATABASES.append(alias)
+
+# Seconds a user's list reads stay on the primary after they write
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '5'))
+
+if REPLICA_DATABASES:
+    DATABASE_ROUTERS = ['src.routers.ReplicaRouter']
+    MIDDLEWARE.append('src.routers.ReplicaPinMiddleware')
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -94,6 +110,65 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Pre-build URL resolver, filtersets and validators when a worker loads the WSGI/ASGI app
+WARMUP_ON_STARTUP = os.getenv("DJANGO_WARMUP_ON_STARTUP", "True") == "True"
+
+# Background jobs (src.jobs); run `python manage.py runworker` or set JOBS_LOCAL_WORKER
+JOBS_RUN_INLINE = os.getenv("JOBS_RUN_INLINE", "False") == "True"
+JOBS_LOCAL_WORKER = os.getenv("JOBS_LOCAL_WORKER", "False") == "True"
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1"))
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 10  # seconds, doubled on every failed attempt
+JOBS_LOCK_TIMEOUT = 300  # seconds before a job claimed by a dead worker is retried
+
+# Response compression (src.compression); brotli is used when the package is installed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# On-demand request profiles (src.profiling)
+PROFILE_DIR = os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles"))
+PROFILE_KEEP = 50
+# Fraction of requests to the profiled views that are profiled without being asked (0 disables)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# Maximum number of ids accepted by GET /tasks/batch/
+TASK_BATCH_MAX_IDS = 100
+
+# Maximum number of ids accepted by PATCH /users/soft-delete/
+USER_BULK_SOFT_DELETE_MAX_IDS = 1000
+
+# Response caches, version counters and throttle buckets all live in the default cache. LocMemCache is
+# private to each process, so a write only invalidates the worker that served it: run more than one
+# worker process with a shared cache, e.g. REDIS_URL="redis://localhost:6379/0".
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Read-through cache for /tasks/<id>/ (src.cache). The per-worker copy is only trusted for
+# TASK_CACHE_LOCAL_TTL seconds, which bounds how stale another worker's write can leave it. Without a
+# shared cache the "shared" tier is per-worker too, so its entries get the same short lifetime.
+TASK_CACHE_TIMEOUT = int(os.getenv("TASK_CACHE_TIMEOUT", str(60 * 5) if REDIS_URL else "5"))
+TASK_CACHE_LOCAL_SIZE = int(os.getenv("TASK_CACHE_LOCAL_SIZE", "1000"))
+TASK_CACHE_LOCAL_TTL = float(os.getenv("TASK_CACHE_LOCAL_TTL", "5"))
+
+# Seconds a stored Idempotency-Key response is replayed for
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", str(60 * 60 * 24)))
+
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "noreply@credes.local")
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -125,16 +200,33 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'src.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'src.renderers.MessagePackParser',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
-        'django_filters.rest_framework.DjangoFilterBackend',
+        'src.filters.CachedFilterBackend',
     ],
+    # Budgets for src.throttling; '<scope>.<role>' overrides '<scope>' for that role.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.getenv('THROTTLE_LOGIN_RATE', '20/min'),
+        'register': os.getenv('THROTTLE_REGISTER_RATE', '10/min'),
+        'list': os.getenv('THROTTLE_LIST_RATE', '120/min'),
+        'list.Admin': os.getenv('THROTTLE_LIST_ADMIN_RATE', '600/min'),
+    },
 }
 
 SIMPLE_JWT = {
+    'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_REFRESH_SERIALIZER': 'src.serializers.RotatingTokenRefreshSerializer',
 }
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
-}
\ No newline at end of file
+# Size of each worker's in-memory filter of recently rotated refresh tokens (src.tokens); 1 MiB by default
+REVOKED_TOKEN_BLOOM_BITS = int(os.getenv("REVOKED_TOKEN_BLOOM_BITS", str(8 * 1024 * 1024)))
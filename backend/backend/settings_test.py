@@ -0,0 +1,45 @@
+"""
+Settings for the in-process test suite, e.g.
+
+    python manage.py test --parallel --settings=backend.settings_test
+
+TEST_DATABASE_URL picks the database (SQLite by default). Set TEST_POSTGRES_URL to also
+run the query plan checks against a local PostgreSQL.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# The historical migrations cannot build a fresh database, so test databases are created from the models.
+DATABASES = {
+    'default': dj_database_url.parse(os.getenv('TEST_DATABASE_URL', f'sqlite:///{BASE_DIR / "test.sqlite3"}')),
+}
+DATABASES['default']['TEST'] = {'MIGRATE': False}
+
+if os.getenv('TEST_POSTGRES_URL'):
+    DATABASES['postgres'] = dj_database_url.parse(os.getenv('TEST_POSTGRES_URL'))
+    DATABASES['postgres']['TEST'] = {'MIGRATE': False}
+
+# A replica that mirrors the test database; test_replicas switches the router on for itself.
+DATABASES['replica_0'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+DATABASE_ROUTERS = []
+REPLICA_DATABASES = []
+
+# Side effects run in-process after commit; no worker, throttling or real password hashing.
+JOBS_RUN_INLINE = True
+JOBS_LOCAL_WORKER = False
+WARMUP_ON_STARTUP = False
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {scope: None for scope in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']},
+}
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Each test clears the cache, so never point the suite at a shared one (REDIS_URL); parallel workers are
+# separate processes and each get their own.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+TASK_CACHE_TIMEOUT = 60 * 5
@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_STARTUP:
+    from src.warmup import warm_up
+    warm_up()
+
+if settings.JOBS_LOCAL_WORKER:
+    from src.jobs import start_local_worker
+    start_local_worker()
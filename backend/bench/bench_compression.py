@@ -0,0 +1,57 @@
+"""
+Bandwidth vs CPU for compressing /tasks/ pages: compressed size and compress/decompress time
+for gzip levels and (when installed) brotli qualities.
+
+    cd backend && python bench/bench_compression.py
+"""
+import gzip
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from bench_msgpack import task_page  # noqa: E402
+from src.compression import brotli  # noqa: E402
+
+PAGE_SIZES = [10, 100, 1000]
+REPEAT = 20
+
+
+def codecs():
+    for level in (1, 6, 9):
+        yield f"gzip-{level}", lambda b, level=level: gzip.compress(b, compresslevel=level, mtime=0), gzip.decompress
+    if brotli is not None:
+        for quality in (1, 5, 11):
+            yield f"br-{quality}", lambda b, quality=quality: brotli.compress(b, quality=quality), brotli.decompress
+
+
+def main():
+    print(f"Responses below COMPRESSION_MIN_SIZE={settings.COMPRESSION_MIN_SIZE} bytes are sent uncompressed.")
+    if brotli is None:
+        print("brotli is not installed; only gzip is measured.")
+    print(f"{'page':<12}{'codec':<9}{'bytes':>10}{'ratio':>8}{'compress ms':>13}{'decompress ms':>15}")
+    for size in PAGE_SIZES:
+        body = JSONRenderer().render(task_page(size))
+        print(f"{'tasks x' + str(size):<12}{'none':<9}{len(body):>10}{'100%':>8}{0:>13.2f}{0:>15.2f}")
+        for name, compress, decompress in codecs():
+            packed = compress(body)
+            compress_ms = timeit.timeit(lambda: compress(body), number=REPEAT) / REPEAT * 1000
+            decompress_ms = timeit.timeit(lambda: decompress(packed), number=REPEAT) / REPEAT * 1000
+            print(f"{'':<12}{name:<9}{len(packed):>10}{len(packed) / len(body) * 100:>7.1f}%"
+                  f"{compress_ms:>13.2f}{decompress_ms:>15.2f}")
+    print("\nCached list pages are stored compressed: a cache hit costs 0 ms of compression instead of the"
+          " 'compress ms' column above.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare JSON and MessagePack for /tasks/ and /users/ pages: payload size and encode/decode time.
+
+    cd backend && python bench/bench_msgpack.py
+"""
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+
+import django  # noqa: E402
+
+django.setup()
+
+import msgpack  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from src.models import Task, User  # noqa: E402
+from src.renderers import MessagePackRenderer  # noqa: E402
+from src.serializers import TaskSerializer, UserListSerializer  # noqa: E402
+
+PAGE_SIZES = [10, 100, 1000]
+REPEAT = 20
+WORDS = "task review deploy fix backend client report update schedule meeting design test data api".split()
+
+
+def description(seed):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120)))
+
+
+def task_page(size):
+    user = User(pk=1, email="bench@example.com", full_name="Bench User", role="User")
+    now = timezone.now()
+    tasks = [
+        Task(pk=i, title=f"Task {i}", description=description(i), status="To-Do",
+             assigned_to=user, created_at=now, updated_at=now)
+        for i in range(size)
+    ]
+    return {"count": size, "next": None, "previous": None, "results": TaskSerializer(tasks, many=True).data}
+
+
+def user_page(size):
+    users = [
+        User(pk=i, email=f"user{i}@example.com", full_name=f"User {i}", role="User", date_joined=timezone.now())
+        for i in range(size)
+    ]
+    return {"count": size, "next": None, "previous": None, "results": UserListSerializer(users, many=True).data}
+
+
+def measure(data):
+    json_renderer, msgpack_renderer = JSONRenderer(), MessagePackRenderer()
+    json_body = json_renderer.render(data)
+    msgpack_body = msgpack_renderer.render(data)
+    return {
+        "json_bytes": len(json_body),
+        "msgpack_bytes": len(msgpack_body),
+        "json_encode_ms": timeit.timeit(lambda: json_renderer.render(data), number=REPEAT) / REPEAT * 1000,
+        "msgpack_encode_ms": timeit.timeit(lambda: msgpack_renderer.render(data), number=REPEAT) / REPEAT * 1000,
+        "json_decode_ms": timeit.timeit(lambda: json.loads(json_body), number=REPEAT) / REPEAT * 1000,
+        "msgpack_decode_ms": timeit.timeit(lambda: msgpack.unpackb(msgpack_body), number=REPEAT) / REPEAT * 1000,
+    }
+
+
+def main():
+    print(f"{'page':<12}{'json B':>10}{'msgpack B':>11}{'size %':>8}"
+          f"{'enc json':>10}{'enc mp':>9}{'dec json':>10}{'dec mp':>9}  (ms)")
+    for name, build in (("tasks", task_page), ("users", user_page)):
+        for size in PAGE_SIZES:
+            r = measure(build(size))
+            print(f"{name + ' x' + str(size):<12}{r['json_bytes']:>10}{r['msgpack_bytes']:>11}"
+                  f"{r['msgpack_bytes'] / r['json_bytes'] * 100:>7.0f}%"
+                  f"{r['json_encode_ms']:>10.2f}{r['msgpack_encode_ms']:>9.2f}"
+                  f"{r['json_decode_ms']:>10.2f}{r['msgpack_decode_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
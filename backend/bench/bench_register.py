@@ -0,0 +1,46 @@
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+API = os.environ.get("API_URL")
+if not API:
+    raise RuntimeError("Set API_URL env var!")
+
+BURST = int(os.environ.get("BURST", "200"))
+CONCURRENCY = int(os.environ.get("CONCURRENCY", "20"))
+
+
+def register(_):
+    start = time.perf_counter()
+    r = requests.post(f"{API}/auth/register/", json={
+        "email": f"bench-{uuid.uuid4()}@example.com",
+        "password": "BenchPass123!",
+        "full_name": "Bench User",
+    })
+    return time.perf_counter() - start, r.status_code
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def main():
+    print(f"Registration burst: {BURST} requests, concurrency {CONCURRENCY}")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(register, range(BURST)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency * 1000 for latency, _ in results]
+    errors = sum(1 for _, code in results if code != 201)
+    print(f"Throughput: {BURST / elapsed:.1f} req/s, errors: {errors}")
+    for pct in (50, 90, 99):
+        print(f"p{pct}: {percentile(latencies, pct):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .compression import accepted_encodings, apply_encoding, compress, decompress, should_compress
+from .routers import reading_from_replica
+
+USER_COUNT_VERSION_KEY = 'user-count-version'
+ADMIN_TASK_LIST_VERSION_KEY = 'task-list-version:admin'
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+
+def task_list_version_key(user_id):
+    return f'task-list-version:user:{user_id}'
+
+
+def comment_list_version_key(task_id):
+    return f'comment-list-version:{task_id}'
+
+
+def task_cache_key(task_id):
+    return f'task:{task_id}'
+
+
+def task_generation_key(task_id):
+    return f'task-generation:{task_id}'
+
+
+def get_version(key):
+    return cache.get(key) or 1
+
+
+def bump_version(key):
+    # Entries keyed on the old version simply stop being read and expire on their own.
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, timeout=None)
+
+
+def invalidate_task_lists(user_ids):
+    """Drop the cached task list pages of the admins and of each of `user_ids`."""
+    bump_version(ADMIN_TASK_LIST_VERSION_KEY)
+    for user_id in set(user_ids):
+        bump_version(task_list_version_key(user_id))
+
+
+class CachedListMixin:
+    """Cache rendered list pages per viewer and format.
+
+    Keys embed the version stored under `get_list_version_key()`, so writers invalidate every page of a
+    list by bumping one key, and `get_list_viewer()`, which names the set of users who see the same
+    pages. Admins see the same data, so by default they share one cache entry per page.
+    Pages above COMPRESSION_MIN_SIZE are stored gzipped, so a hit is served without compressing.
+    """
+
+    def get_list_version_key(self, request):
+        raise NotImplementedError
+
+    def get_list_viewer(self, request):
+        return 'admin' if request.user.role == 'Admin' else request.user.pk
+
+    def should_cache_list(self, request):
+        return True
+
+    def list(self, request, *args, **kwargs):
+        if not self.should_cache_list(request):
+            return super().list(request, *args, **kwargs)
+        viewer = self.get_list_viewer(request)
+        path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = f'list:{viewer}:{request.accepted_renderer.format}:{path_hash}'
+        version = get_version(self.get_list_version_key(request))
+
+        cached = cache.get(key, version=version)
+        if cached is not None:
+            content, content_type, encoding = cached
+            response = HttpResponse(content_type=content_type)
+            if encoding is None:
+                response.content = content
+            elif encoding in accepted_encodings(request):
+                apply_encoding(response, content, encoding)
+            else:
+                response.content = decompress(content, encoding)
+                patch_vary_headers(response, ('Accept-Encoding',))
+            return response
+
+        # A replica may not have caught up with the write that bumped the version yet; caching its page
+        # for the full timeout would stretch seconds of lag into minutes, so keep it only as long as a
+        # writer would be pinned to the primary.
+        timeout = settings.REPLICA_PIN_SECONDS if reading_from_replica() else RESPONSE_CACHE_TIMEOUT
+        response = super().list(request, *args, **kwargs)
+
+        def store(rendered):
+            content, encoding = rendered.content, None
+            if should_compress(rendered):
+                # Stored as gzip whatever the first client asked for: every hit from a client that accepts
+                # gzip (nearly all) is then served without compressing, the rest get it decompressed.
+                content, encoding = compress(rendered.content, 'gzip'), 'gzip'
+                if encoding in accepted_encodings(request):
+                    apply_encoding(rendered, content, encoding)
+            cache.set(key, (content, rendered['Content-Type'], encoding), timeout, version=version)
+
+        response.add_post_render_callback(store)
+        return response
+
+
+# Task detail cache: {'data': serialized task, 'assigned_to_id': ...} per task, in a bounded per-worker
+# LRU in front of the shared cache.
+#
+# A reader that loaded the row before a write commits may only get to cache it after the write's
+# invalidation has run. Shared entries are therefore stored under the task's generation, a random token
+# replaced on every invalidation and read *before* the row is loaded: a late write lands under a dead
+# generation and is never served. The local tier does the same with a per-worker invalidation counter.
+_local_tasks = OrderedDict()
+_local_tasks_lock = threading.Lock()
+_local_invalidations = 0
+
+
+def get_task_generation(task_id):
+    key = task_generation_key(task_id)
+    generation = cache.get(key)
+    if generation is None:
+        # A fresh token rather than a default, so entries cached before the key was evicted stay dead.
+        generation = uuid.uuid4().hex
+        if not cache.add(key, generation, timeout=None):
+            generation = cache.get(key) or generation
+    return generation
+
+
+def get_cached_task(task_id):
+    """Return `(entry, stamp)`. On a miss (`entry` None) pass `stamp` to cache_task with the loaded row."""
+    key = task_cache_key(task_id)
+    now = time.monotonic()
+    with _local_tasks_lock:
+        hit = _local_tasks.get(key)
+        if hit is not None:
+            if hit[0] > now:
+                _local_tasks.move_to_end(key)
+                return hit[1], None
+            del _local_tasks[key]
+        local_stamp = _local_invalidations
+    generation = get_task_generation(task_id)
+    entry = cache.get(key, version=generation)
+    if entry is not None:
+        _store_local(key, entry, now, local_stamp)
+    return entry, (generation, local_stamp)
+
+
+def cache_task(task_id, data, assigned_to_id, stamp):
+    generation, local_stamp = stamp
+    key = task_cache_key(task_id)
+    entry = {'data': dict(data), 'assigned_to_id': assigned_to_id}
+    cache.set(key, entry, settings.TASK_CACHE_TIMEOUT, version=generation)
+    _store_local(key, entry, time.monotonic(), local_stamp)
+
+
+def invalidate_tasks(task_ids):
+    global _local_invalidations
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    with _local_tasks_lock:
+        _local_invalidations += 1
+        for task_id in task_ids:
+            _local_tasks.pop(task_cache_key(task_id), None)
+    # Entries under the old generations are never read again and expire on their own.
+    generation = uuid.uuid4().hex
+    cache.set_many({task_generation_key(task_id): generation for task_id in task_ids}, timeout=None)
+
+
+def clear_local_task_cache():
+    with _local_tasks_lock:
+        _local_tasks.clear()
+
+
+def _store_local(key, entry, now, local_stamp):
+    with _local_tasks_lock:
+        # Something was invalidated since the entry was read, possibly this task: leave it to the next read.
+        if local_stamp != _local_invalidations:
+            return
+        _local_tasks[key] = (now + settings.TASK_CACHE_LOCAL_TTL, entry)
+        _local_tasks.move_to_end(key)
+        while len(_local_tasks) > settings.TASK_CACHE_LOCAL_SIZE:
+            _local_tasks.popitem(last=False)
@@ -0,0 +1,91 @@
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+ACCEPT_ENCODING_TOKEN = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?')
+
+
+def quality(value):
+    """The q-value of an Accept-Encoding token; a malformed one (e.g. `q=1.2.3`) counts as not accepted."""
+    if value is None:
+        return 1.0
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def accepted_encodings(request):
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        match = ACCEPT_ENCODING_TOKEN.match(part)
+        if match and quality(match.group(2)) > 0:
+            accepted.add(match.group(1).lower())
+    return accepted
+
+
+def choose_encoding(request):
+    accepted = accepted_encodings(request)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def decompress(content, encoding):
+    if encoding == 'br':
+        return brotli.decompress(content)
+    return gzip.decompress(content)
+
+
+def apply_encoding(response, content, encoding):
+    """Put already-compressed `content` on `response` and set the matching headers."""
+    response.content = content
+    response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(content))
+    if response.has_header('ETag'):
+        response['ETag'] = re.sub(r'^(W/)?', 'W/', response['ETag'])
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+
+def should_compress(response):
+    return (
+        not response.streaming
+        and not response.has_header('Content-Encoding')
+        and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+    )
+
+
+class CompressionMiddleware:
+    """Compress responses of at least COMPRESSION_MIN_SIZE bytes with brotli or gzip.
+
+    Small responses are left alone: below the threshold the CPU cost outweighs the bytes saved.
+    Responses that already carry a Content-Encoding (e.g. precompressed cache hits) pass through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not should_compress(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request)
+        if encoding is not None:
+            apply_encoding(response, compress(response.content, encoding), encoding)
+        return response
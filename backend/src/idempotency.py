@@ -0,0 +1,74 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from . import jobs
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+
+
+def _request_hash(request):
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    body = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method}:{request.path}:{body}'.encode()).hexdigest()
+
+
+def _replay(stored, request_hash):
+    if stored.request_hash != request_hash:
+        return Response(
+            {"detail": f"{HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(stored.response, status=stored.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+class IdempotentCreateMixin:
+    """Replay the stored response when a client retries a create with the same Idempotency-Key header.
+
+    A retry costs one indexed lookup on (user, key); validation and writes are not run again. The create
+    and the key are committed together, so of two concurrent requests with one key only one creates.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > 255:
+            raise ValidationError({HEADER: "Must be at most 255 characters."})
+
+        request_hash = _request_hash(request)
+        stored = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+        if stored is not None:
+            if stored.expires_at > timezone.now():
+                return _replay(stored, request_hash)
+            stored.delete()
+
+        try:
+            with transaction.atomic():
+                response = super().create(request, *args, **kwargs)
+                IdempotencyKey.objects.create(
+                    user=request.user,
+                    key=key,
+                    request_hash=request_hash,
+                    status_code=response.status_code,
+                    response=response.data,
+                    expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+        except IntegrityError:
+            # A concurrent request with the same key won; our writes were rolled back.
+            stored = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+            if stored is None:
+                raise
+            return _replay(stored, request_hash)
+        jobs.run_periodic_inline(jobs.prune_idempotency_keys)
+        return response
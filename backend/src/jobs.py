@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Comment, IdempotencyKey, Job, RevokedToken, Task
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+_periodic = []
+_periodic_lock = threading.Lock()
+
+
+def job_handler(func):
+    _handlers[func.__name__] = func
+    return func
+
+
+def periodic(seconds):
+    """Run the decorated function from the worker loop at most every `seconds`."""
+    def decorator(func):
+        _periodic.append([seconds, func, None])
+        return func
+    return decorator
+
+
+def enqueue(name, **payload):
+    """Queue slow side effects (email) to run outside the request.
+
+    The row is written on the caller's connection: inside transaction.atomic() it commits or rolls back
+    with the caller's write, otherwise (the default, ATOMIC_REQUESTS is off) it commits on its own right
+    after it. With JOBS_RUN_INLINE the handler runs after commit instead (tests, local dev).
+    """
+    if settings.JOBS_RUN_INLINE:
+        transaction.on_commit(lambda: _handlers[name](**payload))
+        return
+    Job.objects.create(name=name, payload=payload)
+
+
+def claim(limit):
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    due = Job.objects.filter(
+        Q(status=Job.Status.PENDING, run_at__lte=now) | Q(status=Job.Status.RUNNING, locked_at__lt=stale)
+    ).order_by('run_at')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            jobs = list(due.select_for_update(skip_locked=True)[:limit])
+            Job.objects.filter(pk__in=[j.pk for j in jobs]).update(status=Job.Status.RUNNING, locked_at=now)
+        return jobs
+
+    # No row locks (SQLite): claim each candidate with a conditional UPDATE so only one worker wins it.
+    claimed = []
+    for candidate in due[:limit]:
+        won = Job.objects.filter(
+            pk=candidate.pk, status=candidate.status, locked_at=candidate.locked_at
+        ).update(status=Job.Status.RUNNING, locked_at=now)
+        if won:
+            claimed.append(candidate)
+    return claimed
+
+
+def run_job(queued):
+    try:
+        handler = _handlers.get(queued.name)
+        if handler is None:
+            raise LookupError(f"No handler registered for job {queued.name!r}")
+        handler(**queued.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed", queued.pk, queued.name)
+        attempts = queued.attempts + 1
+        failed = attempts >= settings.JOBS_MAX_ATTEMPTS
+        Job.objects.filter(pk=queued.pk).update(
+            status=Job.Status.FAILED if failed else Job.Status.PENDING,
+            attempts=attempts,
+            run_at=timezone.now() + timedelta(seconds=settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1)),
+            locked_at=None,
+            last_error=traceback.format_exc(),
+        )
+        return False
+    Job.objects.filter(pk=queued.pk).delete()
+    return True
+
+
+def run_pending(limit=10):
+    jobs = claim(limit)
+    for queued in jobs:
+        run_job(queued)
+    return len(jobs)
+
+
+def run_periodic():
+    for entry in _periodic:
+        _run_if_due(entry)
+
+
+def run_periodic_inline(func):
+    """Run the periodic job `func` here and now if it is due in this process.
+
+    For housekeeping that must not depend on a worker running: the request paths that create the rows
+    call this, so a process prunes them at most once per interval even with no runworker.
+    """
+    for entry in _periodic:
+        if entry[1] is func:
+            _run_if_due(entry)
+
+
+def _run_if_due(entry):
+    now = time.monotonic()
+    with _periodic_lock:
+        seconds, func, last_run = entry
+        if last_run is not None and now - last_run < seconds:
+            return
+        entry[2] = now
+    try:
+        func()
+    except Exception:
+        logger.exception("Periodic job %s failed", func.__name__)
+
+
+def work(batch=10, interval=None, stop=None):
+    interval = settings.JOBS_POLL_INTERVAL if interval is None else interval
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        close_old_connections()
+        try:
+            run_periodic()
+            processed = run_pending(batch)
+        except Exception:
+            logger.exception("Job worker iteration failed")
+            processed = 0
+        if not processed:
+            stop.wait(interval)
+
+
+def start_local_worker():
+    """Run the job loop in a daemon thread of this process (JOBS_LOCAL_WORKER)."""
+    thread = threading.Thread(target=work, name='local-job-worker', daemon=True)
+    thread.start()
+    return thread
+
+
+# Handlers
+
+@job_handler
+def task_reassigned(task_id, previous_assignee_id):
+    task = Task.objects.select_related('assigned_to').filter(pk=task_id).first()
+    if task is None:
+        return
+    send_mail(
+        f"Task assigned to you: {task.title}",
+        f"You have been assigned the task \"{task.title}\" (#{task.pk}).",
+        None,
+        [task.assigned_to.email],
+    )
+
+
+@job_handler
+def comment_created(comment_id):
+    comment = Comment.objects.select_related('task__assigned_to', 'author').filter(pk=comment_id).first()
+    if comment is None:
+        return
+    assignee = comment.task.assigned_to
+    if assignee.pk == comment.author_id or not assignee.is_active:
+        return
+    send_mail(
+        f"New comment on: {comment.task.title}",
+        f"{comment.author.full_name} commented on \"{comment.task.title}\":\n\n{comment.text}",
+        None,
+        [assignee.email],
+    )
+
+
+@periodic(60 * 60)
+def prune_idempotency_keys():
+    IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+
+
+@periodic(60 * 60)
+def prune_revoked_tokens():
+    # An expired refresh token is rejected on its own; its revocation row is dead weight.
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from src import jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs (email notifications) and periodic pruning."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process the jobs that are due now and exit.")
+        parser.add_argument('--batch', type=int, default=10, help="Jobs claimed per iteration.")
+        parser.add_argument('--interval', type=float, default=None, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            jobs.run_periodic()
+            total = 0
+            while processed := jobs.run_pending(options['batch']):
+                total += processed
+            self.stdout.write(f"Processed {total} job(s).")
+            return
+        self.stdout.write("Worker started, waiting for jobs.")
+        try:
+            jobs.work(batch=options['batch'], interval=options['interval'])
+        except KeyboardInterrupt:
+            pass
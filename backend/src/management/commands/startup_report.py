@@ -0,0 +1,49 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Load the WSGI app with startup warm-up off, then time each warm-up phase in the same cold process.
+COLD_START = (
+    'import json, backend.wsgi; from src.warmup import warm_up; print(json.dumps(warm_up()))'
+)
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = "Report cold-start import times (python -X importtime) and warm-up phase timings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help="Number of slowest imports to list.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', COLD_START],
+            env={**os.environ, 'DJANGO_WARMUP_ON_STARTUP': 'False'}, capture_output=True, text=True,
+        )
+        wall = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            # stderr is mostly -X importtime output; keep the rest (the traceback).
+            error = '\n'.join(line for line in result.stderr.splitlines() if not line.startswith('import time:'))
+            raise CommandError(f"Cold start failed (exit status {result.returncode}):\n{error}")
+
+        imports = []
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match:
+                imports.append((int(match.group(2)), int(match.group(1)), match.group(4)))
+        imports.sort(reverse=True)
+
+        self.stdout.write(f"Cold start of backend.wsgi (incl. warm-up): {wall:.0f} ms wall")
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for cumulative, own, module in imports[:options['top']]:
+            self.stdout.write(f"{cumulative / 1000:>14.1f} {own / 1000:>9.1f}  {module}")
+
+        self.stdout.write("\nWarm-up phases (cold process):")
+        for phase, ms in json.loads(result.stdout.splitlines()[-1]).items():
+            self.stdout.write(f"{ms:>14.1f} ms  {phase}")
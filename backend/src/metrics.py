@@ -0,0 +1,16 @@
+import threading
+from collections import Counter
+
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def incr(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def snapshot():
+    """Counters of this worker process since it started."""
+    with _lock:
+        return dict(_counters)
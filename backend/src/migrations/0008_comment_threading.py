@@ -0,0 +1,63 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def set_root_paths(apps, schema_editor):
+    # Every existing comment is top level: its path is just its own id.
+    Comment = apps.get_model("src", "Comment")
+    batch = []
+    for comment in Comment.objects.only("pk").iterator(chunk_size=1000):
+        comment.path = f"{comment.pk:010d}"
+        batch.append(comment)
+        if len(batch) == 1000:
+            Comment.objects.bulk_update(batch, ["path"])
+            batch = []
+    Comment.objects.bulk_update(batch, ["path"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("src", "0007_revokedtoken"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="replies",
+                to="src.comment",
+            ),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="path",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="reply_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(set_root_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["task", "path"], name="comment_task_path_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["task", "parent", "-created_at"],
+                name="comment_task_parent_idx",
+            ),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
 from django.conf import settings
@@ -47,6 +47,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['full_name', 'role']
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['role', 'is_active'], name='user_role_active_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -77,10 +82,27 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # One index per filter (none / assigned_to / status) x ordering or range column offered by TaskFilter.
+        indexes = [
+            models.Index(fields=['created_at'], name='task_created_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+            models.Index(fields=['assigned_to', 'created_at'], name='task_assigned_to_created_idx'),
+            models.Index(fields=['assigned_to', 'updated_at'], name='task_assigned_to_updated_idx'),
+            models.Index(fields=['status', 'created_at'], name='task_status_created_idx'),
+            models.Index(fields=['status', 'updated_at'], name='task_status_updated_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
 class Comment(models.Model):
+    # `path` is the zero-padded ids from the thread's root down to this comment, so a thread is one
+    # contiguous range of the (task, path) index, already in display order.
+    PATH_SEGMENT_DIGITS = 10
+    PATH_MAX_LENGTH = 255
+    MAX_DEPTH = PATH_MAX_LENGTH // PATH_SEGMENT_DIGITS - 1
+
     task = models.ForeignKey(
         Task,
         on_delete=models.CASCADE,
@@ -91,8 +113,104 @@ class Comment(models.Model):
         on_delete=models.PROTECT,
         related_name='comments'
     )
+    parent = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='replies'
+    )
     text = models.TextField()
+    path = models.CharField(max_length=PATH_MAX_LENGTH, blank=True, default='')
+    depth = models.PositiveSmallIntegerField(default=0)
+    reply_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'path'], name='comment_task_path_idx'),
+            models.Index(fields=['task', 'parent', '-created_at'], name='comment_task_parent_idx'),
+        ]
+
+    def __str__(self):
+        return f"Comment by {self.author} on {self.task}"
+
+    @classmethod
+    def subtree_bounds(cls, path):
+        """Half-open [lower, upper) range of `path` values in the thread rooted at `path`.
+
+        The upper bound is the next sibling's path rather than a prefix match: it keeps the lookup a
+        plain index range on every backend and collation.
+        """
+        width = cls.PATH_SEGMENT_DIGITS
+        return path, path[:-width] + f'{int(path[-width:]) + 1:0{width}d}'
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            self.depth = self.parent.depth + 1 if self.parent_id else 0
+            super().save(*args, **kwargs)
+            # The path ends with our own id, so it can only be written once the row exists.
+            prefix = self.parent.path if self.parent_id else ''
+            self.path = f'{prefix}{self.pk:0{self.PATH_SEGMENT_DIGITS}d}'
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+            if self.parent_id:
+                Comment.objects.filter(pk=self.parent_id).update(reply_count=models.F('reply_count') + 1)
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        FAILED = 'failed', 'Failed'
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
     def __str__(self):
-        return f"Comment by {self.author} on {self.task}"
\ No newline at end of file
+        return f"{self.name} ({self.status})"
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+class RevokedToken(models.Model):
+    """A refresh token that has been rotated away. Rows can go once the token would have expired anyway."""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], name='revoked_token_expires_idx'),
+        ]
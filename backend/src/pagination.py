@@ -0,0 +1,35 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+from .cache import USER_COUNT_VERSION_KEY, get_version
+
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that reuses the COUNT(*) of an identical query until `version_key` is bumped."""
+    version_key = None
+
+    @cached_property
+    def count(self):
+        sql, params = self.object_list.query.sql_with_params()
+        digest = hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+        key = f'count:{self.version_key}:{digest}'
+        version = get_version(self.version_key)
+        count = cache.get(key, version=version)
+        if count is None:
+            count = super().count
+            cache.set(key, count, COUNT_CACHE_TIMEOUT, version=version)
+        return count
+
+
+class UserCountPaginator(CachedCountPaginator):
+    version_key = USER_COUNT_VERSION_KEY
+
+
+class UserListPagination(PageNumberPagination):
+    django_paginator_class = UserCountPaginator
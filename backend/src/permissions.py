@@ -16,10 +16,10 @@ class IsAdminOrAssignedToForTask(BasePermission):
         if user.role == 'Admin':
             return True
         # SAFE_METHODS means GET, HEAD, OPTIONS
-        if request.method in SAFE_METHODS and obj.assigned_to == user:
+        if request.method in SAFE_METHODS and obj.assigned_to_id == user.pk:
             return True
         # Allow PATCH only if patching "status" and user is assignee
-        if request.method == "PATCH" and obj.assigned_to == user:
+        if request.method == "PATCH" and obj.assigned_to_id == user.pk:
             data = request.data
             # If status is the only field being updated
             return set(data.keys()) <= {"status"}
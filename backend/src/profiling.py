@@ -0,0 +1,148 @@
+import cProfile
+import json
+import pstats
+import random
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .permissions import IsAdmin
+
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAM = 'profile'
+TRUE_VALUES = ('1', 'true', 'True')
+
+
+def profile_dir():
+    path = Path(settings.PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def list_profiles():
+    summaries = []
+    for path in sorted(profile_dir().glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True):
+        summaries.append(json.loads(path.read_text()))
+    return summaries
+
+
+def profile_path(profile_id):
+    """Path of the pstats dump for `profile_id`, or None. Ids are UUID hex, so they are safe in a path."""
+    try:
+        profile_id = uuid.UUID(hex=profile_id).hex
+    except ValueError:
+        return None
+    path = profile_dir() / f'{profile_id}.prof'
+    return path if path.exists() else None
+
+
+class RequestProfile:
+    def __init__(self, request, sampled=False):
+        self.request = request
+        self.sampled = sampled
+        self.profiler = cProfile.Profile()
+        self.db_time = 0.0
+        self.queries = 0
+        self._stack = ExitStack()
+
+    def _time_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    def start(self):
+        """Start profiling. False if another profiler is already running (Python 3.12+ allows only one)."""
+        try:
+            self.profiler.enable()
+        except ValueError:
+            return False
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._time_query))
+        self.started = time.perf_counter()
+        return True
+
+    def stop(self):
+        self.profiler.disable()
+        total = time.perf_counter() - self.started
+        self._stack.close()
+
+        profile_id = uuid.uuid4().hex
+        directory = profile_dir()
+        self.profiler.dump_stats(directory / f'{profile_id}.prof')
+        summary = {
+            'id': profile_id,
+            'method': self.request.method,
+            'path': self.request.get_full_path(),
+            'user': self.request.user.pk,
+            'sampled': self.sampled,
+            'created_at': timezone.now().isoformat(),
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(self.db_time * 1000, 2),
+            'queries': self.queries,
+            'serializer_ms': round(self._serializer_time() * 1000, 2),
+        }
+        (directory / f'{profile_id}.json').write_text(json.dumps(summary))
+        self._prune(directory)
+        return profile_id
+
+    def _serializer_time(self):
+        # The outermost `.data` access on a DRF serializer covers all nested to_representation calls.
+        stats = pstats.Stats(self.profiler).stats
+        return max(
+            (cumulative for (filename, _, name), (_, _, _, cumulative, _) in stats.items()
+             if name == 'data' and filename.endswith('rest_framework/serializers.py')),
+            default=0.0,
+        )
+
+    @staticmethod
+    def _prune(directory):
+        summaries = sorted(directory.glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in summaries[settings.PROFILE_KEEP:]:
+            old.unlink(missing_ok=True)
+            old.with_suffix('.prof').unlink(missing_ok=True)
+
+
+class ProfilingMixin:
+    """Profile a request when an admin sends `X-Profile: 1` or `?profile=1`, bypassing the list cache.
+
+    The profile covers the view, serializers and queries (with DB time measured separately) and is
+    stored under PROFILE_DIR; its id is returned in the `X-Profile-Id` header. With PROFILE_SAMPLE_RATE
+    set, that fraction of all other requests is profiled too, so slow production requests show up in
+    /profiles/ without anyone having to reproduce them; those responses carry no header. Untriggered
+    requests only pay for one header and one query-param lookup and a random() call.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._request_profile = None
+        triggered = (
+            (request.META.get(HEADER) in TRUE_VALUES or request.query_params.get(QUERY_PARAM) in TRUE_VALUES)
+            and IsAdmin().has_permission(request, self)
+        )
+        if triggered or random.random() < settings.PROFILE_SAMPLE_RATE:
+            request_profile = RequestProfile(request, sampled=not triggered)
+            # A concurrent profiled request in this worker wins; this one just runs unprofiled.
+            if request_profile.start():
+                self._request_profile = request_profile
+
+    def should_cache_list(self, request):
+        # A profile of a cache hit would show no queries: measure the real work instead.
+        return self._request_profile is None and super().should_cache_list(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        request_profile = getattr(self, '_request_profile', None)
+        if request_profile is not None:
+            profile_id = request_profile.stop()
+            if not request_profile.sampled:
+                response['X-Profile-Id'] = profile_id
+            self._request_profile = None
+        return response
@@ -0,0 +1,81 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+from . import metrics
+
+_use_replica = ContextVar('use_replica', default=False)
+_wrote = ContextVar('wrote', default=False)
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def reading_from_replica():
+    """Whether reads in the current request are being routed to a replica."""
+    return _use_replica.get() and bool(settings.REPLICA_DATABASES)
+
+
+class ReplicaRouter:
+    """Reads go to a replica only inside views that opted in via ReplicaReadMixin; everything else uses default."""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and settings.REPLICA_DATABASES:
+            metrics.incr('db.read.replica')
+            return random.choice(settings.REPLICA_DATABASES)
+        metrics.incr('db.read.primary')
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        metrics.incr('db.write.primary')
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaPinMiddleware:
+    """After a request that wrote, keep that user's reads on the primary for REPLICA_PIN_SECONDS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            # DRF copies the JWT-authenticated user onto the underlying HttpRequest.
+            user = getattr(request, 'user', None)
+            if _wrote.get() and user is not None and user.is_authenticated:
+                cache.set(_pin_key(user.pk), True, settings.REPLICA_PIN_SECONDS)
+            return response
+        finally:
+            _wrote.reset(token)
+
+
+class ReplicaReadMixin:
+    """Serve safe-method requests of a read-only listing from a replica unless the user recently wrote."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._replica_token = None
+        if not settings.REPLICA_DATABASES or request.method not in SAFE_METHODS:
+            return
+        if cache.get(_pin_key(request.user.pk)):
+            metrics.incr('db.read.pinned')
+            return
+        self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if getattr(self, '_replica_token', None) is not None:
+            _use_replica.reset(self._replica_token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,7 +1,10 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import User, Task, Comment
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .tokens import is_revoked, revoke
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -28,13 +31,29 @@ class TaskSerializer(serializers.ModelSerializer):
         read_only_fields = ('created_at', 'updated_at')
 
     def get_assigned_to_inactive(self, obj):
+        # List querysets annotate the assignee's flag in the same query instead of loading each assignee.
+        if hasattr(obj, 'assigned_to_is_active'):
+            return not obj.assigned_to_is_active
         return not obj.assigned_to.is_active if obj.assigned_to else None
 
+class TaskBatchQuerySerializer(serializers.Serializer):
+    # Bounded to the bigint primary key range, so the id__in query never overflows.
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1, max_value=2 ** 63 - 1), allow_empty=False)
+
+    def to_internal_value(self, data):
+        ids = [i.strip() for i in data.get('ids', '').split(',') if i.strip()]
+        return super().to_internal_value({'ids': ids} if ids else {})
+
+    def validate_ids(self, ids):
+        if len(ids) > settings.TASK_BATCH_MAX_IDS:
+            raise serializers.ValidationError(f'At most {settings.TASK_BATCH_MAX_IDS} ids per request.')
+        return ids
+
 class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = '__all__'
-        read_only_fields = ('created_at',)
+        read_only_fields = ('created_at', 'path', 'depth', 'reply_count')
 
 class UserListSerializer(serializers.ModelSerializer):
     class Meta:
@@ -47,4 +66,19 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         data = super().validate(attrs)
         if not self.user.is_active:
             raise AuthenticationFailed('User account is inactive (soft deleted).')
-        return data
\ No newline at end of file
+        return data
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh that also rotates the refresh token; every refresh token can be used exactly once.
+
+    Inactive (soft-deleted) users are already refused by simplejwt's USER_AUTHENTICATION_RULE check.
+    """
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        jti = refresh[jwt_settings.JTI_CLAIM]
+        if is_revoked(jti):
+            raise InvalidToken('Token has already been used.')
+        data = super().validate(attrs)
+        if not revoke(jti, refresh['exp']):
+            raise InvalidToken('Token has already been used.')
+        return data
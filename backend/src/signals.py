@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import USER_COUNT_VERSION_KEY, bump_version, invalidate_tasks
+from .models import Comment, Task, User
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_count_on_save(sender, instance, created, update_fields=None, **kwargs):
+    # Login only touches last_login, which never changes list membership.
+    if not created and update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_version(USER_COUNT_VERSION_KEY)
+    if not created:
+        # Cached tasks carry the assignee's is_active as `assigned_to_inactive`.
+        task_ids = list(Task.objects.filter(assigned_to=instance).values_list('pk', flat=True))
+        transaction.on_commit(lambda: invalidate_tasks(task_ids))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_count_on_delete(sender, instance, **kwargs):
+    bump_version(USER_COUNT_VERSION_KEY)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_cached_task(sender, instance, **kwargs):
+    # After commit, so the next read loads the new row. A read already in flight may still cache the old
+    # one, but under the generation this replaces, where it is never served (see src.cache).
+    task_id = instance.pk
+    transaction.on_commit(lambda: invalidate_tasks([task_id]))
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_reply_count(sender, instance, **kwargs):
+    if instance.parent_id:
+        Comment.objects.filter(pk=instance.parent_id).update(reply_count=F('reply_count') - 1)
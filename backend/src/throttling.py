@@ -0,0 +1,132 @@
+import threading
+import time
+
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+MAX_TOUCHED_KEYS = 10000
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Per-user (or per-IP when anonymous) token bucket, implemented as GCRA.
+
+    A rate of N/period refills one token every period/N and holds at most N. The cache stores the bucket's
+    theoretical arrival time (TAT, in microseconds): a request pushes it one emission interval further
+    with a single atomic incr() and is allowed while the TAT stays within one period of now. Unlike a
+    fixed window there is no boundary at which a second full burst becomes available.
+
+    A denial also records, per worker, when the bucket can next admit a request; until then this worker
+    rejects the client without any cache call. Other workers only ever push the TAT further out, so a
+    local denial is never wrong, only possibly shorter than the shared one.
+
+    Rates come from DEFAULT_THROTTLE_RATES, looked up as '<scope>.<role>' first and then '<scope>'.
+    """
+    scope = None
+    safe_methods_only = False
+
+    # When this worker last refreshed each key's expiry; incr() keeps the expiry set at creation.
+    _touched = {}
+    # Key -> time (microseconds) before which this worker rejects it without asking the cache.
+    _denied_until = {}
+    _lock = threading.Lock()
+
+    def get_rate(self, request):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        role = getattr(request.user, 'role', None)
+        rate = rates.get(f'{self.scope}.{role}') if role else None
+        return rate or rates.get(self.scope)
+
+    def get_cache_key(self, request):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return f'throttle:{self.scope}:{ident}'
+
+    def allow_request(self, request, view):
+        if self.safe_methods_only and request.method not in SAFE_METHODS:
+            return True
+        rate = self.get_rate(request)
+        if rate is None:
+            return True
+        limit, duration = SimpleRateThrottle.parse_rate(None, rate)
+        key = self.get_cache_key(request)
+        now = int(time.time() * 1_000_000)
+        period = duration * 1_000_000
+        interval = period // limit
+
+        denied_until = self._denied_until.get(key)
+        if denied_until is not None:
+            if now < denied_until:
+                self.wait_seconds = (denied_until - now) / 1_000_000
+                return False
+            self._denied_until.pop(key, None)
+
+        tat = self._advance(key, interval, now, duration)
+        if tat - now <= period:
+            self._keep_alive(key, now, duration)
+            return True
+        # Denied requests do not consume a token.
+        try:
+            cache.decr(key, interval)
+        except ValueError:
+            pass
+        self._deny(key, tat - period)
+        self.wait_seconds = (tat - period - now) / 1_000_000
+        return False
+
+    def _advance(self, key, interval, now, duration):
+        """Add one emission interval to the stored TAT and return the new value."""
+        try:
+            tat = cache.incr(key, interval)
+        except ValueError:
+            if cache.add(key, now + interval, 2 * duration):
+                return now + interval
+            tat = cache.incr(key, interval)
+        if tat - interval < now:
+            # The bucket had refilled completely: restart from now. Two idle requests racing here can
+            # each get a token, which a full bucket would have granted anyway.
+            tat = now + interval
+            cache.set(key, tat, 2 * duration)
+        return tat
+
+    def _deny(self, key, until):
+        with self._lock:
+            if len(self._denied_until) >= MAX_TOUCHED_KEYS:
+                self._denied_until.clear()
+            self._denied_until[key] = until
+
+    def _keep_alive(self, key, now, duration):
+        with self._lock:
+            last = self._touched.get(key)
+            if last is not None and now - last < duration * 500_000:
+                return
+            if len(self._touched) >= MAX_TOUCHED_KEYS:
+                self._touched.clear()
+            self._touched[key] = now
+        cache.touch(key, 2 * duration)
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+def clear_local_throttle_state():
+    """Forget this worker's denials and expiry refreshes, e.g. after the shared cache was cleared."""
+    with TokenBucketThrottle._lock:
+        TokenBucketThrottle._denied_until.clear()
+        TokenBucketThrottle._touched.clear()
+
+
+class LoginRateThrottle(TokenBucketThrottle):
+    scope = 'login'
+
+
+class RegisterRateThrottle(TokenBucketThrottle):
+    scope = 'register'
+
+
+class ListRateThrottle(TokenBucketThrottle):
+    scope = 'list'
+    safe_methods_only = True
@@ -0,0 +1,61 @@
+import hashlib
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from . import jobs
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """Fixed-size set membership with false positives but no false negatives."""
+
+    def __init__(self, bits, hashes):
+        self.bits = bits
+        self.hashes = hashes
+        self.capacity = bits // 10  # ~1% false positives with 7 hashes
+        self.count = 0
+        self._array = bytearray(bits // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=4 * self.hashes).digest()
+        for i in range(self.hashes):
+            yield int.from_bytes(digest[4 * i:4 * i + 4], 'little') % self.bits
+
+    def add(self, value):
+        with self._lock:
+            if self.count >= self.capacity:
+                # Full filters answer "maybe" to everything; start over; the table stays authoritative.
+                self._array = bytearray(self.bits // 8)
+                self.count = 0
+            for pos in self._positions(value):
+                self._array[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def __contains__(self, value):
+        array = self._array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+# Refresh tokens this worker has seen rotated. A miss proves nothing (another worker may have rotated it),
+# so it only short-cuts replays to one indexed lookup; revoke() is what enforces single use.
+_recently_revoked = BloomFilter(settings.REVOKED_TOKEN_BLOOM_BITS, 7)
+
+
+def is_revoked(jti):
+    return jti in _recently_revoked and RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke(jti, exp):
+    """Record `jti` as used. Returns False if it already was, i.e. the token is being replayed."""
+    _recently_revoked.add(jti)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=datetime.fromtimestamp(exp, tz=dt_timezone.utc))
+    except IntegrityError:
+        return False
+    jobs.run_periodic_inline(jobs.prune_revoked_tokens)
+    return True
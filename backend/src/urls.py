@@ -3,7 +3,8 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from .views import (
     RegisterView, TaskListCreateView, TaskRetrieveUpdateDestroyView,
-    CommentListCreateView, UserListView, UserSoftDeleteView, MyTokenObtainPairView
+    CommentListCreateView, UserListView, UserSoftDeleteView, MyTokenObtainPairView,
+    MetricsView, TaskBatchView, UserBulkSoftDeleteView, ProfileListView, ProfileDownloadView
 )
 
 @csrf_exempt
@@ -16,10 +17,15 @@ def api_root(request):
             "/auth/register/": "POST - Register a new user",
             "/auth/login/": "POST - Obtain JWT token (login)",
             "/tasks/": "GET, POST - List all tasks or create a new task (with filters and pagination)",
+            "/tasks/batch/?ids=<id>,<id>": "GET - Fetch several tasks at once, in request order",
             "/tasks/<pk>/": "GET, PUT, PATCH, DELETE - Retrieve, update, or delete a specific task",
-            "/tasks/<task_id>/comments/": "GET, POST - List or add comments for a task (with filters and pagination)",
+            "/tasks/<task_id>/comments/": "GET, POST - List or add comments for a task (with filters and pagination; ?thread=<id>, ?top_level=1)",
             "/users/": "GET - List all users (with filters and pagination)",
-            "/users/<pk>/soft-delete/": "PATCH - Soft delete a user"
+            "/users/<pk>/soft-delete/": "PATCH - Soft delete a user (optionally reassigning their tasks)",
+            "/users/soft-delete/": "PATCH - Soft delete several users at once",
+            "/profiles/": "GET - Stored request profiles; send X-Profile: 1 as an admin to record one (admin only)",
+            "/profiles/<id>/": "GET - Download a profile as a pstats file (admin only)",
+            "/metrics/": "GET - Per-worker counters such as database routing (admin only)"
         }
     })
 
@@ -28,8 +34,13 @@ urlpatterns = [
     path('auth/register/', RegisterView.as_view(), name='register'),
     path('auth/login/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('tasks/', TaskListCreateView.as_view(), name='task-list-create'),
+    path('tasks/batch/', TaskBatchView.as_view(), name='task-batch'),
     path('tasks/<int:pk>/', TaskRetrieveUpdateDestroyView.as_view(), name='task-detail'),
     path('tasks/<int:task_id>/comments/', CommentListCreateView.as_view(), name='comment-list-create'),
     path('users/', UserListView.as_view(), name='user-list'),
+    path('users/soft-delete/', UserBulkSoftDeleteView.as_view(), name='user-bulk-soft-delete'),
     path('users/<int:pk>/soft-delete/', UserSoftDeleteView.as_view(), name='user-soft-delete'),
+    path('profiles/', ProfileListView.as_view(), name='profile-list'),
+    path('profiles/<str:profile_id>/', ProfileDownloadView.as_view(), name='profile-download'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
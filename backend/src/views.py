@@ -1,26 +1,45 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics, permissions
-from rest_framework.exceptions import PermissionDenied, NotFound
+from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.permissions import AllowAny
+from django.conf import settings
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-from django_filters.rest_framework import DjangoFilterBackend
 #mymodules
 from .models import Task, Comment, User
 from .serializers import (
-    RegisterSerializer, TaskSerializer, CommentSerializer, UserListSerializer, MyTokenObtainPairSerializer
+    RegisterSerializer, TaskSerializer, CommentSerializer, UserListSerializer, MyTokenObtainPairSerializer,
+    TaskBatchQuerySerializer,
 )
 from .permissions import IsAdmin, IsActiveUser, IsAdminOrAssignedToForTask
+from .pagination import UserListPagination
+from .filters import CachedFilterBackend, TaskFilter
+from .routers import ReplicaReadMixin
+from .throttling import ListRateThrottle, LoginRateThrottle, RegisterRateThrottle
+from .cache import (
+    ADMIN_TASK_LIST_VERSION_KEY, USER_COUNT_VERSION_KEY, CachedListMixin, bump_version, cache_task,
+    comment_list_version_key, get_cached_task, invalidate_task_lists, invalidate_tasks, task_list_version_key,
+)
+from .idempotency import IdempotentCreateMixin
+from .profiling import ProfilingMixin, list_profiles, profile_path
+from . import jobs, metrics
 
 
 @method_decorator(cache_page(60 * 5), name='dispatch')
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+    throttle_classes = [LoginRateThrottle]
 
 class RegisterView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [RegisterRateThrottle]
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
@@ -28,30 +47,59 @@ class RegisterView(APIView):
             return Response({'message': 'User registered successfully.'}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-@method_decorator(cache_page(60 * 5), name='dispatch')
-class TaskListCreateView(generics.ListCreateAPIView):
+class TaskListCreateView(ProfilingMixin, IdempotentCreateMixin, CachedListMixin, ReplicaReadMixin,
+                         generics.ListCreateAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [IsActiveUser]
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['status', 'assigned_to']
+    throttle_classes = [ListRateThrottle]
+    filter_backends = [CachedFilterBackend]
+    filterset_class = TaskFilter
 
     def get_queryset(self):
         user = self.request.user
+        tasks = Task.objects.annotate(assigned_to_is_active=F('assigned_to__is_active')).order_by('id')
         if user.role == 'Admin':
-            return Task.objects.all()
-        return Task.objects.filter(assigned_to=user)
+            return tasks
+        return tasks.filter(assigned_to=user)
+
+    def get_list_version_key(self, request):
+        if request.user.role == 'Admin':
+            return ADMIN_TASK_LIST_VERSION_KEY
+        return task_list_version_key(request.user.pk)
 
     def create(self, request, *args, **kwargs):
         if request.user.role != 'Admin':
             raise PermissionDenied("Only admins can create tasks.")
         return super().create(request, *args, **kwargs)
 
-class TaskRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+    def perform_create(self, serializer):
+        task = serializer.save()
+        invalidate_task_lists([task.assigned_to_id])
+
+class TaskRetrieveUpdateDestroyView(ProfilingMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [IsActiveUser, IsAdminOrAssignedToForTask]
 
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            return self.queryset.annotate(assigned_to_is_active=F('assigned_to__is_active'))
+        # The annotation would be read before a write and go stale if it reassigns the task, so writes
+        # load the assignee instead; saving a new assigned_to replaces it.
+        return self.queryset.select_related('assigned_to')
+
+    def retrieve(self, request, *args, **kwargs):
+        entry, stamp = get_cached_task(self.kwargs['pk'])
+        if entry is None:
+            task = self.get_object()
+            data = self.get_serializer(task).data
+            cache_task(task.pk, data, task.assigned_to_id, stamp)
+            return Response(data)
+        # The permission only looks at the assignee, so a stub stands in for the row.
+        self.check_object_permissions(request, Task(pk=self.kwargs['pk'], assigned_to_id=entry['assigned_to_id']))
+        return Response(entry['data'])
+
     def destroy(self, request, *args, **kwargs):
         if request.user.role != 'Admin':
             raise PermissionDenied("Only admins can delete tasks.")
@@ -62,53 +110,231 @@ class TaskRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         user = request.user
         if user.role == "Admin":
             return super().update(request, *args, **kwargs)
-        if set(request.data.keys()) <= {"status"} and task.assigned_to == user:
+        if set(request.data.keys()) <= {"status"} and task.assigned_to_id == user.pk:
             return super().update(request, *args, **kwargs)
         raise PermissionDenied("Only admin or assigned user (for status) can update task.")
 
-@method_decorator(cache_page(60 * 5), name='dispatch')
-class CommentListCreateView(generics.ListCreateAPIView):
+    def perform_update(self, serializer):
+        previous_assignee_id = serializer.instance.assigned_to_id
+        task = serializer.save()
+        invalidate_task_lists([previous_assignee_id, task.assigned_to_id])
+        if task.assigned_to_id != previous_assignee_id:
+            bump_version(comment_list_version_key(task.pk))
+            jobs.enqueue('task_reassigned', task_id=task.pk, previous_assignee_id=previous_assignee_id)
+
+    def perform_destroy(self, instance):
+        assignee_id = instance.assigned_to_id
+        task_id = instance.pk
+        instance.delete()
+        invalidate_task_lists([assignee_id])
+        bump_version(comment_list_version_key(task_id))
+
+class TaskBatchView(ProfilingMixin, ReplicaReadMixin, APIView):
+    permission_classes = [IsActiveUser]
+    throttle_classes = [ListRateThrottle]
+
+    def get(self, request):
+        query = TaskBatchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        ids = query.validated_data['ids']
+
+        # One query for every id; RBAC is applied per row so forbidden and missing ids can be told apart.
+        tasks = {task.pk: task for task in Task.objects.select_related('assigned_to').filter(pk__in=ids)}
+        user = request.user
+        results = []
+        for task_id in ids:
+            task = tasks.get(task_id)
+            if task is None:
+                results.append({'id': task_id, 'error': 'not_found'})
+            elif user.role != 'Admin' and task.assigned_to_id != user.pk:
+                results.append({'id': task_id, 'error': 'forbidden'})
+            else:
+                results.append(TaskSerializer(task).data)
+        return Response({'results': results})
+
+class CommentListCreateView(ProfilingMixin, IdempotentCreateMixin, CachedListMixin, ReplicaReadMixin,
+                            generics.ListCreateAPIView):
     serializer_class = CommentSerializer
     permission_classes = [IsActiveUser]
-    filter_backends = [DjangoFilterBackend]
+    throttle_classes = [ListRateThrottle]
+    filter_backends = [CachedFilterBackend]
     filterset_fields = ['author']
 
-    def get_queryset(self):
-        task = Task.objects.get(pk=self.kwargs['task_id'])
+    def get_task(self):
+        if not hasattr(self, '_task'):
+            self._task = get_object_or_404(Task.objects.only('id', 'assigned_to_id'), pk=self.kwargs['task_id'])
+        return self._task
+
+    def can_read_comments(self):
         user = self.request.user
-        if user.role == "Admin":
-            return Comment.objects.filter(task=task)
-        if task.assigned_to == user:
-            return Comment.objects.filter(task=task)
-        return Comment.objects.none()
+        return user.role == "Admin" or self.get_task().assigned_to_id == user.pk
+
+    def get_queryset(self):
+        if not self.can_read_comments():
+            return Comment.objects.none()
+        comments = Comment.objects.filter(task=self.get_task())
+        params = self.request.query_params
+        if params.get('thread'):
+            return self.get_thread(comments, params['thread'])
+        if params.get('top_level') in ('1', 'true', 'True'):
+            # Served by (task, parent, -created_at); reply_count is stored, so no join or GROUP BY.
+            return comments.filter(parent__isnull=True).order_by('-created_at', '-id')
+        # Threads in display order; for flat comments this is creation order.
+        return comments.order_by('path')
+
+    def get_thread(self, comments, thread_id):
+        """The comment `thread_id` and all of its replies at any depth, in display order."""
+        try:
+            root = comments.only('path').get(pk=thread_id)
+        except (Comment.DoesNotExist, ValueError):
+            raise NotFound("Comment not found on this task.")
+        lower, upper = Comment.subtree_bounds(root.path)
+        return comments.filter(path__gte=lower, path__lt=upper).order_by('path')
+
+    def get_list_version_key(self, request):
+        return comment_list_version_key(self.kwargs['task_id'])
+
+    def get_list_viewer(self, request):
+        # Access is decided here, before the cache lookup, from the current assignee: a hit can never
+        # outlive a reassignment or the task itself. Everyone allowed to read sees the same pages.
+        return 'reader' if self.can_read_comments() else 'other'
 
     def perform_create(self, serializer):
         task = Task.objects.get(pk=self.kwargs['task_id'])
         user = self.request.user
         if (task.assigned_to != user) and (user.role != "Admin"):
             raise PermissionDenied("Only the assigned user or an Admin can comment on this task.")
-        serializer.save(author=user, task=task)
+        parent = serializer.validated_data.get('parent')
+        if parent is not None:
+            if parent.task_id != task.pk:
+                raise ValidationError({'parent': 'Parent comment belongs to a different task.'})
+            if parent.depth >= Comment.MAX_DEPTH:
+                raise ValidationError({'parent': f'Replies can be nested at most {Comment.MAX_DEPTH} deep.'})
+        comment = serializer.save(author=user, task=task)
+        bump_version(comment_list_version_key(task.pk))
+        if task.assigned_to_id != user.pk and task.assigned_to.is_active:
+            jobs.enqueue('comment_created', comment_id=comment.pk)
 
-class UserListView(generics.ListAPIView):
-    queryset = User.objects.all()
+class UserListView(ProfilingMixin, ReplicaReadMixin, generics.ListAPIView):
+    # Only load the columns the directory shows; password hashes never leave the DB.
+    queryset = User.objects.only(*UserListSerializer.Meta.fields).order_by('id')
     serializer_class = UserListSerializer
     permission_classes = [IsAdmin]
-    filter_backends = [DjangoFilterBackend]
+    throttle_classes = [ListRateThrottle]
+    pagination_class = UserListPagination
+    filter_backends = [CachedFilterBackend]
     filterset_fields = ['is_active', 'role']
 
+def _is_user_id(value):
+    # bool is an int subclass, so JSON true/false would otherwise pass as ids 1 and 0; the upper
+    # bound keeps the pk__in query inside the bigint range.
+    return isinstance(value, int) and not isinstance(value, bool) and 0 < value < 2 ** 63
+
+def _request_object(request):
+    """The request body, which these endpoints require to be an object (or empty)."""
+    if not isinstance(request.data, dict):
+        raise ValidationError({'non_field_errors': [
+            f'Invalid data. Expected a dictionary, but got {type(request.data).__name__}.'
+        ]})
+    return request.data
+
+def _get_reassign_target(request, excluded_ids):
+    reassign_to = _request_object(request).get('reassign_to')
+    if reassign_to in (None, ''):
+        return None
+    try:
+        if isinstance(reassign_to, bool):
+            raise TypeError
+        target = User.objects.only('id', 'is_active').get(pk=reassign_to)
+    except (User.DoesNotExist, ValueError, TypeError, OverflowError):
+        raise ValidationError({'reassign_to': 'User not found.'})
+    if not target.is_active or target.pk in excluded_ids:
+        raise ValidationError({'reassign_to': 'Tasks can only be reassigned to an active user.'})
+    return target
+
+def _soft_delete_users(user_ids, reassign_to=None):
+    """Deactivate users with one UPDATE and, optionally, move all their tasks with another.
+
+    Returns the number of tasks reassigned. Writing only is_active keeps concurrent edits to other
+    columns intact; `assigned_to_inactive` on tasks is derived from it, so nothing else needs flagging.
+    """
+    reassigned = 0
+    with transaction.atomic():
+        # Their cached tasks change assignee or `assigned_to_inactive` either way.
+        task_ids = list(Task.objects.filter(assigned_to__in=user_ids).values_list('pk', flat=True))
+        transaction.on_commit(lambda: invalidate_tasks(task_ids))
+        User.objects.filter(pk__in=user_ids).update(is_active=False)
+        if reassign_to is not None:
+            reassigned = Task.objects.filter(assigned_to__in=user_ids).update(
+                assigned_to=reassign_to, updated_at=timezone.now()
+            )
+    # Bulk updates skip the model signals, so invalidate the lists explicitly.
+    invalidate_task_lists(list(user_ids) + ([reassign_to.pk] if reassign_to is not None else []))
+    bump_version(USER_COUNT_VERSION_KEY)
+    return reassigned
+
 class UserSoftDeleteView(APIView):
     permission_classes = [IsAdmin]
 
     def patch(self, request, pk):
         try:
-            user = User.objects.get(pk=pk)
+            user = User.objects.only(*UserListSerializer.Meta.fields).get(pk=pk)
         except User.DoesNotExist:
             raise NotFound("User not found.")
         if not user.is_active:
             return Response({"detail": "User already inactive."}, status=status.HTTP_400_BAD_REQUEST)
         if user == request.user:
             raise PermissionDenied("You cannot soft-delete yourself.")
+        reassign_to = _get_reassign_target(request, {user.pk})
+        reassigned = _soft_delete_users([user.pk], reassign_to)
         user.is_active = False
-        user.save()
-        serializer = UserListSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        data = UserListSerializer(user).data
+        if reassign_to is not None:
+            data['tasks_reassigned'] = reassigned
+        return Response(data, status=status.HTTP_200_OK)
+
+class UserBulkSoftDeleteView(APIView):
+    permission_classes = [IsAdmin]
+
+    def patch(self, request):
+        ids = _request_object(request).get('ids')
+        if not isinstance(ids, list) or not ids or not all(_is_user_id(i) for i in ids):
+            raise ValidationError({'ids': 'Must be a non-empty list of user ids.'})
+        if len(ids) > settings.USER_BULK_SOFT_DELETE_MAX_IDS:
+            raise ValidationError({'ids': f'At most {settings.USER_BULK_SOFT_DELETE_MAX_IDS} ids per request.'})
+        if request.user.pk in ids:
+            raise PermissionDenied("You cannot soft-delete yourself.")
+
+        found = dict(User.objects.filter(pk__in=ids).values_list('pk', 'is_active'))
+        to_deactivate = [i for i in dict.fromkeys(ids) if found.get(i)]
+        reassign_to = _get_reassign_target(request, set(ids))
+        reassigned = _soft_delete_users(to_deactivate, reassign_to) if to_deactivate else 0
+        data = {
+            'deactivated': to_deactivate,
+            'already_inactive': [i for i in ids if i in found and not found[i]],
+            'not_found': [i for i in ids if i not in found],
+        }
+        if reassign_to is not None:
+            data['tasks_reassigned'] = reassigned
+        return Response(data, status=status.HTTP_200_OK)
+
+class MetricsView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+class ProfileListView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response(list_profiles())
+
+class ProfileDownloadView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request, profile_id):
+        path = profile_path(profile_id)
+        if path is None:
+            raise NotFound("Profile not found.")
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
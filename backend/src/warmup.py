@@ -0,0 +1,84 @@
+import importlib
+import time
+
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from .filters import CachedFilterBackend
+
+EAGER_IMPORTS = [
+    'rest_framework.generics',
+    'rest_framework.pagination',
+    'rest_framework.renderers',
+    'rest_framework.parsers',
+    'rest_framework_simplejwt.authentication',
+    'rest_framework_simplejwt.tokens',
+    'django_filters.rest_framework',
+]
+
+
+def _import_modules():
+    for module in EAGER_IMPORTS:
+        importlib.import_module(module)
+    from rest_framework.settings import api_settings
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+    # Both settings objects import the configured classes on first attribute access.
+    for name in ('DEFAULT_AUTHENTICATION_CLASSES', 'DEFAULT_PERMISSION_CLASSES', 'DEFAULT_RENDERER_CLASSES',
+                 'DEFAULT_PARSER_CLASSES', 'DEFAULT_PAGINATION_CLASS', 'DEFAULT_FILTER_BACKENDS'):
+        getattr(api_settings, name)
+    jwt_settings.AUTH_TOKEN_CLASSES
+
+
+def _iter_views(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class is not None:
+                yield view_class
+
+
+def _build_url_resolver():
+    resolver = get_resolver()
+    # reverse_dict populates the resolver tree and compiles every route's regex.
+    resolver.reverse_dict
+    resolver.resolve('/')
+
+
+def _build_filtersets():
+    for view_class in _iter_views(get_resolver().url_patterns):
+        if CachedFilterBackend not in getattr(view_class, 'filter_backends', ()):
+            continue
+        if not (getattr(view_class, 'filterset_fields', None) or getattr(view_class, 'filterset_class', None)):
+            continue
+        queryset = getattr(view_class, 'queryset', None)
+        if queryset is None:
+            queryset = view_class.serializer_class.Meta.model._default_manager.all()
+        CachedFilterBackend().get_filterset_class(view_class(), queryset)
+
+
+def _load_password_validators():
+    from django.contrib.auth import password_validation
+    # Loads CommonPasswordValidator's gzip word list.
+    password_validation.get_default_password_validators()
+
+
+PHASES = [
+    ('imports', _import_modules),
+    ('url_resolver', _build_url_resolver),
+    ('filtersets', _build_filtersets),
+    ('password_validators', _load_password_validators),
+]
+
+
+def warm_up():
+    """Build what the first requests of a fresh worker would otherwise build lazily.
+
+    Returns the time spent in each phase, in milliseconds.
+    """
+    timings = {}
+    for name, phase in PHASES:
+        start = time.perf_counter()
+        phase()
+        timings[name] = (time.perf_counter() - start) * 1000
+    return timings
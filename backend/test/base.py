@@ -0,0 +1,60 @@
+import uuid
+
+from django.core.cache import cache
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from src.cache import clear_local_task_cache
+from src.models import User
+from src.throttling import clear_local_throttle_state
+
+PASSWORD = "TestPass123!"
+
+
+def unique_email():
+    return f"user-{uuid.uuid4()}@example.com"
+
+
+class ApiClientMixin:
+    """In-process API tests. Each parallel worker gets its own database and cache."""
+
+    def setUp(self):
+        # Response and count caches are keyed by ids, which a rolled back test may hand out again.
+        cache.clear()
+        clear_local_task_cache()
+        clear_local_throttle_state()
+
+    def create_user(self, role="User", email=None, password=PASSWORD):
+        return User.objects.create_user(email=email or unique_email(), password=password,
+                                        full_name=f"Test {role}", role=role)
+
+    def register(self, email=None, password=PASSWORD, full_name="Test User"):
+        email = email or unique_email()
+        r = self.client.post("/auth/register/", {"email": email, "password": password, "full_name": full_name},
+                             format="json")
+        self.assertIn(r.status_code, (200, 201), r.content)
+        return email
+
+    def login(self, email, password=PASSWORD):
+        r = self.client.post("/auth/login/", {"email": email, "password": password}, format="json")
+        self.assertEqual(r.status_code, 200, r.content)
+        tokens = r.json()
+        tokens["user_id"] = int(AccessToken(tokens["access"])["user_id"])
+        return tokens
+
+    def request(self, method, path, data=None, tokens=None, **headers):
+        """Send a request as `tokens` (anonymous if None). Extra `headers` are WSGI environ keys."""
+        if tokens:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {tokens['access']}"
+        return getattr(self.client, method)(path, data, format="json", **headers)
+
+
+class ApiTestCase(ApiClientMixin, APITestCase):
+    def request(self, *args, **kwargs):
+        # Run the request's on-commit callbacks (inline jobs, cache invalidation) before returning.
+        with self.captureOnCommitCallbacks(execute=True):
+            return super().request(*args, **kwargs)
+
+
+class ApiTransactionTestCase(ApiClientMixin, APITransactionTestCase):
+    """For tests that need committed data, e.g. to read it back through a second connection."""
@@ -1,80 +1,190 @@
-import pytest
-import requests
-import uuid
-import os
-import jwt
-
-API = os.environ.get("API_URL", "http://localhost:8000")
-
-def unique_email():
-    return f"user-{uuid.uuid4()}@example.com"
-
-def user_id_from_token(token):
-    payload = jwt.decode(token, options={"verify_signature": False})
-    return int(payload["user_id"])
-
-@pytest.fixture
-def user():
-    email = unique_email()
-    password = "TestPass123!"
-    full_name = "Test User"
-    r = requests.post(f"{API}/auth/register/", json={
-        "email": email,
-        "password": password,
-        "full_name": full_name,
-    })
-    assert r.status_code in (200, 201)
-    r = requests.post(f"{API}/auth/login/", json={
-        "email": email,
-        "password": password,
-    })
-    assert r.status_code == 200
-    tokens = r.json()
-    user_id = user_id_from_token(tokens["access"])
-    return {
-        "email": email,
-        "password": password,
-        "access": tokens["access"],
-        "refresh": tokens["refresh"],
-        "user_id": user_id,
-    }
-
-def test_create_and_update_task(user):
-    headers = {"Authorization": f"Bearer {user['access']}"}
-    # Create
-    r = requests.post(f"{API}/tasks/", json={
-        "title": "API Test Task",
-        "description": "Pytest-created",
-        "status": "To-Do",
-        "assigned_to": user["user_id"],
-    }, headers=headers)
-    assert r.status_code in (200, 201)
-    task = r.json()
-    task_id = task["id"]
-    assert task["assigned_to"] == user["user_id"]
-
-    # Comment
-    r = requests.post(f"{API}/tasks/{task_id}/comments/", json={
-        "text": "Automated comment",
-        "task": task_id,
-        "author": user["user_id"]
-    }, headers=headers)
-    assert r.status_code in (200, 201)
-
-    # Update
-    r = requests.patch(f"{API}/tasks/{task_id}/", json={"title": "Pytest Updated"}, headers=headers)
-    assert r.status_code == 200
-
-    # Delete
-    r = requests.delete(f"{API}/tasks/{task_id}/", headers=headers)
-    assert r.status_code in (200, 204)
-
-def test_bad_token(user):
-    bad_headers = {"Authorization": "Bearer badtoken"}
-    r = requests.get(f"{API}/tasks/", headers=bad_headers)
-    assert r.status_code in (401, 403)
-
-def test_missing_required_field(user):
-    headers = {"Authorization": f"Bearer {user['access']}"}
-    r = requests.post(f"{API}/tasks/", headers=headers, json={"description": "Missing title"})
-    assert r.status_code in (400, 422)
\ No newline at end of file
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from src.cache import cache_task, clear_local_task_cache, get_cached_task
+from src.models import Task
+from src.serializers import TaskSerializer
+
+from .base import ApiTestCase
+
+
+class TaskApiTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.login(self.register())
+        # Only admins may create and delete tasks, so the CRUD round trip runs as one.
+        self.admin = self.login(self.create_user(role="Admin").email)
+
+    def test_create_and_update_task(self):
+        r = self.request("post", "/tasks/", {
+            "title": "API Test Task",
+            "description": "Created in-process",
+            "status": "To-Do",
+            "assigned_to": self.user["user_id"],
+        }, tokens=self.admin)
+        self.assertEqual(r.status_code, 201, r.content)
+        task = r.json()
+        task_id = task["id"]
+        self.assertEqual(task["assigned_to"], self.user["user_id"])
+
+        r = self.request("post", f"/tasks/{task_id}/comments/", {
+            "text": "Automated comment",
+            "task": task_id,
+            "author": self.user["user_id"],
+        }, tokens=self.user)
+        self.assertEqual(r.status_code, 201, r.content)
+
+        r = self.request("patch", f"/tasks/{task_id}/", {"title": "Updated"}, tokens=self.admin)
+        self.assertEqual(r.status_code, 200)
+
+        r = self.request("delete", f"/tasks/{task_id}/", tokens=self.admin)
+        self.assertEqual(r.status_code, 204)
+
+    def test_bad_token(self):
+        r = self.request("get", "/tasks/", tokens={"access": "badtoken"})
+        self.assertIn(r.status_code, (401, 403))
+
+    def test_missing_required_field(self):
+        r = self.request("post", "/tasks/", {"description": "Missing title"}, tokens=self.admin)
+        self.assertIn(r.status_code, (400, 422))
+
+
+class TaskDetailCacheTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.login(self.register())
+        self.other = self.login(self.register())
+        self.admin = self.login(self.create_user(role="Admin").email)
+        r = self.request("post", "/tasks/", {"title": "Hot", "status": "To-Do", "assigned_to": self.user["user_id"]},
+                         tokens=self.admin)
+        self.task_id = r.json()["id"]
+
+    def test_repeat_reads_skip_the_task_table(self):
+        self.assertEqual(self.request("get", f"/tasks/{self.task_id}/", tokens=self.user).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            r = self.request("get", f"/tasks/{self.task_id}/", tokens=self.user)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["title"], "Hot")
+        self.assertFalse([q for q in queries if "src_task" in q["sql"]])
+
+    def test_cached_read_still_checks_the_assignee(self):
+        self.request("get", f"/tasks/{self.task_id}/", tokens=self.user)
+        r = self.request("get", f"/tasks/{self.task_id}/", tokens=self.other)
+        self.assertEqual(r.status_code, 403)
+
+    def test_writes_invalidate(self):
+        self.request("get", f"/tasks/{self.task_id}/", tokens=self.user)
+        self.request("patch", f"/tasks/{self.task_id}/", {"status": "Done"}, tokens=self.user)
+        self.assertEqual(self.request("get", f"/tasks/{self.task_id}/", tokens=self.user).json()["status"], "Done")
+
+        self.request("patch", f"/users/{self.user['user_id']}/soft-delete/",
+                     {"reassign_to": self.other["user_id"]}, tokens=self.admin)
+        r = self.request("get", f"/tasks/{self.task_id}/", tokens=self.other)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["assigned_to"], self.other["user_id"])
+
+        self.request("delete", f"/tasks/{self.task_id}/", tokens=self.admin)
+        self.assertEqual(self.request("get", f"/tasks/{self.task_id}/", tokens=self.admin).status_code, 404)
+
+    def test_reassigning_updates_assigned_to_inactive(self):
+        self.request("patch", f"/users/{self.user['user_id']}/soft-delete/", tokens=self.admin)
+        self.assertIs(self.request("get", f"/tasks/{self.task_id}/", tokens=self.admin).json()["assigned_to_inactive"],
+                      True)
+        r = self.request("patch", f"/tasks/{self.task_id}/", {"assigned_to": self.other["user_id"]}, tokens=self.admin)
+        self.assertEqual(r.status_code, 200, r.content)
+        self.assertIs(r.json()["assigned_to_inactive"], False)
+        self.assertEqual(self.request("get", f"/tasks/{self.task_id}/", tokens=self.admin).json(), r.json())
+
+    def test_read_from_before_a_write_is_not_cached(self):
+        # A reader misses and loads the row, a write commits and invalidates, then the reader caches.
+        entry, stamp = get_cached_task(self.task_id)
+        self.assertIsNone(entry)
+        stale = TaskSerializer(Task.objects.get(pk=self.task_id)).data
+        self.request("patch", f"/tasks/{self.task_id}/", {"status": "Done"}, tokens=self.user)
+        cache_task(self.task_id, stale, self.user["user_id"], stamp)
+
+        self.assertEqual(self.request("get", f"/tasks/{self.task_id}/", tokens=self.user).json()["status"], "Done")
+        # Other workers only have the shared tier.
+        clear_local_task_cache()
+        self.assertEqual(self.request("get", f"/tasks/{self.task_id}/", tokens=self.user).json()["status"], "Done")
+
+
+class CommentThreadTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.login(self.create_user(role="Admin").email)
+        self.user = self.login(self.register())
+        self.task_id = self.create_task()
+
+    def create_task(self):
+        r = self.request("post", "/tasks/", {"title": "Threaded", "assigned_to": self.user["user_id"]},
+                         tokens=self.admin)
+        return r.json()["id"]
+
+    def comment(self, text, parent=None, task_id=None):
+        task_id = task_id or self.task_id
+        return self.request("post", f"/tasks/{task_id}/comments/", {
+            "text": text, "task": task_id, "author": self.user["user_id"], "parent": parent,
+        }, tokens=self.user)
+
+    def test_thread_and_top_level(self):
+        first = self.comment("first").json()["id"]
+        reply = self.comment("reply", parent=first).json()["id"]
+        nested = self.comment("nested", parent=reply).json()
+        self.assertEqual(nested["depth"], 2)
+        second = self.comment("second").json()["id"]
+
+        r = self.request("get", f"/tasks/{self.task_id}/comments/?thread={first}", tokens=self.user)
+        self.assertEqual([c["text"] for c in r.json()["results"]], ["first", "reply", "nested"])
+
+        r = self.request("get", f"/tasks/{self.task_id}/comments/?top_level=1", tokens=self.user)
+        results = r.json()["results"]
+        self.assertEqual([c["id"] for c in results], [second, first])
+        self.assertEqual([c["reply_count"] for c in results], [0, 1])
+
+        r = self.request("get", f"/tasks/{self.task_id}/comments/", tokens=self.user)
+        self.assertEqual([c["text"] for c in r.json()["results"]], ["first", "reply", "nested", "second"])
+
+    def test_parent_must_belong_to_the_task(self):
+        other_task = self.create_task()
+        parent = self.comment("elsewhere", task_id=other_task).json()["id"]
+        r = self.comment("reply", parent=parent)
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("parent", r.json())
+
+    def test_unknown_thread(self):
+        r = self.request("get", f"/tasks/{self.task_id}/comments/?thread=999999", tokens=self.user)
+        self.assertEqual(r.status_code, 404)
+
+
+class CommentListAccessTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.login(self.create_user(role="Admin").email)
+        self.user = self.login(self.register())
+        self.other = self.login(self.register())
+        r = self.request("post", "/tasks/", {"title": "Discussed", "assigned_to": self.user["user_id"]},
+                         tokens=self.admin)
+        self.task_id = r.json()["id"]
+        self.request("post", f"/tasks/{self.task_id}/comments/",
+                     {"text": "Private", "task": self.task_id, "author": self.user["user_id"]}, tokens=self.user)
+        self.url = f"/tasks/{self.task_id}/comments/"
+
+    def reassign(self, tokens):
+        r = self.request("patch", f"/tasks/{self.task_id}/", {"assigned_to": tokens["user_id"]}, tokens=self.admin)
+        self.assertEqual(r.status_code, 200, r.content)
+
+    def test_reassignment_revokes_cached_pages(self):
+        self.assertEqual(self.request("get", self.url, tokens=self.user).json()["count"], 1)
+        self.reassign(self.other)
+        self.assertEqual(self.request("get", self.url, tokens=self.user).json()["count"], 0)
+
+    def test_reassignment_grants_cached_pages(self):
+        self.assertEqual(self.request("get", self.url, tokens=self.other).json()["count"], 0)
+        self.reassign(self.other)
+        self.assertEqual(self.request("get", self.url, tokens=self.other).json()["count"], 1)
+
+    def test_deleted_task_is_not_found(self):
+        self.assertEqual(self.request("get", self.url, tokens=self.admin).status_code, 200)
+        self.request("delete", f"/tasks/{self.task_id}/", tokens=self.admin)
+        self.assertEqual(self.request("get", self.url, tokens=self.admin).status_code, 404)
@@ -0,0 +1,47 @@
+from django.test import override_settings
+
+from src.models import Task
+
+from .base import ApiTestCase
+
+
+class TaskBatchTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.login(self.create_user(role="Admin").email)
+        self.user = self.login(self.register())
+        other = self.create_user()
+        self.mine = [Task.objects.create(title=f"Mine {i}", assigned_to_id=self.user["user_id"]).pk for i in range(2)]
+        self.theirs = Task.objects.create(title="Theirs", assigned_to=other).pk
+
+    def batch(self, ids, tokens=None):
+        return self.request("get", f"/tasks/batch/?ids={ids}", tokens=tokens or self.user)
+
+    def test_results_follow_request_order(self):
+        missing = self.theirs + 1000
+        r = self.batch(f"{self.mine[1]},{missing},{self.theirs},{self.mine[0]}")
+        self.assertEqual(r.status_code, 200)
+        results = r.json()["results"]
+        self.assertEqual([item["id"] for item in results], [self.mine[1], missing, self.theirs, self.mine[0]])
+        self.assertEqual(results[0]["title"], "Mine 1")
+        self.assertEqual(results[1], {"id": missing, "error": "not_found"})
+        self.assertEqual(results[2], {"id": self.theirs, "error": "forbidden"})
+        self.assertNotIn("error", results[3])
+
+    def test_admin_sees_every_task(self):
+        r = self.batch(f"{self.theirs},{self.mine[0]}", tokens=self.admin)
+        self.assertEqual([item.get("error") for item in r.json()["results"]], [None, None])
+
+    def test_invalid_ids(self):
+        for ids in ("", "abc", "0", "-1", "99999999999999999999999", f"{self.mine[0]},x"):
+            with self.subTest(ids=ids):
+                r = self.batch(ids)
+                self.assertEqual(r.status_code, 400)
+                self.assertIn("ids", r.json())
+
+    @override_settings(TASK_BATCH_MAX_IDS=3)
+    def test_max_ids(self):
+        self.assertEqual(self.batch("1,2,3").status_code, 200)
+        r = self.batch("1,2,3,4")
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("At most 3", str(r.json()["ids"]))
@@ -0,0 +1,103 @@
+import gzip
+from unittest import mock
+
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from src.compression import CompressionMiddleware, accepted_encodings
+
+from .base import ApiTestCase
+
+MIN_SIZE = 100
+
+
+@override_settings(COMPRESSION_MIN_SIZE=MIN_SIZE)
+class CompressionMiddlewareTests(SimpleTestCase):
+    def respond(self, response, accept_encoding="gzip"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda _: response)(request)
+
+    def test_compresses_at_the_threshold(self):
+        body = b"x" * MIN_SIZE
+        response = HttpResponse(body)
+        response["ETag"] = '"abc"'
+        response = self.respond(response)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(response["ETag"], 'W/"abc"')
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), body)
+
+    def test_small_responses_pass_through(self):
+        response = self.respond(HttpResponse(b"x" * (MIN_SIZE - 1)))
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response.has_header("Vary"))
+
+    def test_without_an_accepted_encoding_only_varies(self):
+        for accept_encoding in ("", "identity", "gzip;q=0", "gzip;q=1.2.3", "deflate"):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.respond(HttpResponse(b"x" * MIN_SIZE), accept_encoding)
+                self.assertFalse(response.has_header("Content-Encoding"))
+                self.assertEqual(response.content, b"x" * MIN_SIZE)
+                self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_already_encoded_responses_pass_through(self):
+        response = HttpResponse(b"x" * MIN_SIZE)
+        response["Content-Encoding"] = "br"
+        response = self.respond(response)
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response.content, b"x" * MIN_SIZE)
+
+    def test_streaming_responses_pass_through(self):
+        response = self.respond(StreamingHttpResponse([b"x" * MIN_SIZE]))
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), b"x" * MIN_SIZE)
+
+    def test_accepted_encodings(self):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="GZIP;q=0.5, br;q=0, deflate;q=1.2.3, *")
+        self.assertEqual(accepted_encodings(request), {"gzip", "*"})
+
+
+@override_settings(COMPRESSION_MIN_SIZE=MIN_SIZE)
+class PrecompressedListCacheTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.login(self.create_user(role="Admin").email)
+        assignee = self.login(self.register())
+        for i in range(5):
+            self.request("post", "/tasks/", {"title": f"Compressed {i}", "description": "d" * 50,
+                                             "assigned_to": assignee["user_id"]}, tokens=self.admin)
+
+    def get_list(self, accept_encoding):
+        return self.request("get", "/tasks/", tokens=self.admin, HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    def test_hit_is_served_precompressed(self):
+        miss = self.get_list("gzip")
+        self.assertEqual(miss["Content-Encoding"], "gzip")
+        with CaptureQueriesContext(connection) as queries:
+            hit = self.get_list("gzip")
+        self.assertFalse([q for q in queries if "src_task" in q["sql"]])
+        self.assertEqual(hit["Content-Encoding"], "gzip")
+        self.assertEqual(hit.content, miss.content)
+
+    def test_hit_is_decompressed_for_clients_without_gzip(self):
+        miss = self.get_list("gzip")
+        with CaptureQueriesContext(connection) as queries:
+            hit = self.get_list("identity")
+        self.assertFalse([q for q in queries if "src_task" in q["sql"]])
+        self.assertFalse(hit.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", hit["Vary"])
+        self.assertEqual(hit.content, gzip.decompress(miss.content))
+        self.assertEqual(len(hit.json()["results"]), 5)
+
+    def test_page_is_stored_compressed_whoever_fills_it(self):
+        miss = self.get_list("")
+        self.assertFalse(miss.has_header("Content-Encoding"))
+        for accept_encoding in ("gzip", "br, gzip;q=0.5"):
+            with self.subTest(accept_encoding=accept_encoding), mock.patch("src.compression.gzip.compress") as gz:
+                hit = self.get_list(accept_encoding)
+            gz.assert_not_called()
+            self.assertEqual(hit["Content-Encoding"], "gzip")
+            self.assertEqual(gzip.decompress(hit.content), miss.content)
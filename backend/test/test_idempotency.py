@@ -0,0 +1,92 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from src import jobs
+from src.models import IdempotencyKey, Task
+
+from .base import ApiTestCase
+
+
+class IdempotentCreateTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.login(self.create_user(role="Admin").email)
+        self.user = self.login(self.register())
+        self.body = {"title": "Once", "assigned_to": self.user["user_id"]}
+
+    def create(self, body=None, key="key-1", tokens=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {(tokens or self.admin)['access']}", "HTTP_IDEMPOTENCY_KEY": key}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/tasks/", body or self.body, format="json", **headers)
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.create()
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", first)
+
+        retry = self.create()
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_key_reused_with_a_different_body(self):
+        self.create()
+        r = self.create({**self.body, "title": "Other"})
+        self.assertEqual(r.status_code, 422)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        other_admin = self.login(self.create_user(role="Admin").email)
+        self.create()
+        r = self.create(tokens=other_admin)
+        self.assertNotIn("Idempotent-Replayed", r)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_expired_key_creates_again(self):
+        first = self.create()
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        r = self.create()
+        self.assertEqual(r.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", r)
+        self.assertNotEqual(r.json()["id"], first.json()["id"])
+        self.assertEqual(IdempotencyKey.objects.get().response["id"], r.json()["id"])
+
+    def test_expired_keys_are_pruned_without_a_worker(self):
+        self.create(key="old")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        # Fresh bookkeeping, as in a process that has not pruned yet.
+        with mock.patch.object(jobs, "_periodic", [[60 * 60, jobs.prune_idempotency_keys, None]]):
+            self.create(key="new")
+            self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["new"])
+            # Due at most once per interval: the next create does not prune again.
+            IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+            self.create(key="newer")
+        self.assertEqual(IdempotencyKey.objects.count(), 2)
+
+    def test_concurrent_duplicate_replays_the_winner(self):
+        first = self.create()
+        # Make this request miss the stored key on its first lookup, as if the other request had not
+        # committed yet; its own insert then hits the unique constraint and it must replay the winner.
+        real_filter = IdempotencyKey.objects.filter
+        lookups = []
+
+        def filter_missing_first(*args, **kwargs):
+            lookups.append(kwargs)
+            queryset = real_filter(*args, **kwargs)
+            return queryset.none() if len(lookups) == 1 else queryset
+
+        with mock.patch.object(IdempotencyKey.objects, 'filter', side_effect=filter_missing_first):
+            r = self.create()
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(r["Idempotent-Replayed"], "true")
+        self.assertEqual(r.json(), first.json())
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_overlong_key(self):
+        r = self.create(key="k" * 256)
+        self.assertEqual(r.status_code, 400)
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from src import jobs
+from src.models import Job
+
+from .base import ApiTestCase
+
+
+class QueueTests(TestCase):
+    def test_claim_takes_due_jobs_once(self):
+        due = [Job.objects.create(name='noop') for _ in range(3)]
+        Job.objects.create(name='noop', run_at=timezone.now() + timedelta(minutes=5))
+
+        claimed = jobs.claim(10)
+        self.assertEqual(sorted(j.pk for j in claimed), [j.pk for j in due])
+        self.assertEqual(Job.objects.filter(status=Job.Status.RUNNING, locked_at__isnull=False).count(), 3)
+        self.assertEqual(jobs.claim(10), [])
+
+    def test_claim_respects_the_limit(self):
+        for _ in range(3):
+            Job.objects.create(name='noop')
+        self.assertEqual(len(jobs.claim(2)), 2)
+        self.assertEqual(len(jobs.claim(2)), 1)
+
+    def test_stale_running_jobs_are_reclaimed(self):
+        stale = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT + 1)
+        abandoned = Job.objects.create(name='noop', status=Job.Status.RUNNING, locked_at=stale)
+        Job.objects.create(name='noop', status=Job.Status.RUNNING, locked_at=timezone.now())
+        self.assertEqual([j.pk for j in jobs.claim(10)], [abandoned.pk])
+
+    def test_failures_back_off_then_give_up(self):
+        failing = mock.Mock(side_effect=RuntimeError('boom'))
+        job = Job.objects.create(name='failing')
+        with mock.patch.dict(jobs._handlers, {'failing': failing}), self.assertLogs('src.jobs', 'ERROR'):
+            for attempt in range(1, settings.JOBS_MAX_ATTEMPTS + 1):
+                before = timezone.now()
+                self.assertFalse(jobs.run_job(Job.objects.get(pk=job.pk)))
+                job.refresh_from_db()
+                self.assertEqual(job.attempts, attempt)
+                self.assertIn('boom', job.last_error)
+                self.assertIsNone(job.locked_at)
+                backoff = timedelta(seconds=settings.JOBS_RETRY_BACKOFF * 2 ** (attempt - 1))
+                self.assertGreaterEqual(job.run_at, before + backoff)
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(failing.call_count, settings.JOBS_MAX_ATTEMPTS)
+        self.assertEqual(jobs.claim(10), [])
+
+    def test_successful_jobs_are_deleted(self):
+        done = mock.Mock()
+        job = Job.objects.create(name='done', payload={'x': 1})
+        with mock.patch.dict(jobs._handlers, {'done': done}):
+            self.assertTrue(jobs.run_job(job))
+        done.assert_called_once_with(x=1)
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(JOBS_RUN_INLINE=False)
+class QueuedSideEffectTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.login(self.create_user(role="Admin").email)
+        self.user = self.login(self.register())
+
+    def test_lists_are_invalidated_without_a_worker(self):
+        self.assertEqual(self.request("get", "/tasks/", tokens=self.user).json()["count"], 0)
+        r = self.request("post", "/tasks/", {"title": "New", "assigned_to": self.user["user_id"]}, tokens=self.admin)
+        task_id = r.json()["id"]
+        self.assertEqual(self.request("get", "/tasks/", tokens=self.user).json()["count"], 1)
+
+        self.request("get", f"/tasks/{task_id}/comments/", tokens=self.user)
+        self.request("post", f"/tasks/{task_id}/comments/",
+                     {"text": "Own note", "task": task_id, "author": self.user["user_id"]}, tokens=self.user)
+        self.assertEqual(self.request("get", f"/tasks/{task_id}/comments/", tokens=self.user).json()["count"], 1)
+        # Commenting on your own task notifies nobody, so nothing is queued.
+        self.assertFalse(Job.objects.exists())
+
+    def test_runworker_once_sends_queued_notifications(self):
+        r = self.request("post", "/tasks/", {"title": "New", "assigned_to": self.user["user_id"]}, tokens=self.admin)
+        task_id = r.json()["id"]
+        self.request("post", f"/tasks/{task_id}/comments/",
+                     {"text": "Please look", "task": task_id, "author": self.user["user_id"]}, tokens=self.admin)
+        self.assertEqual(list(Job.objects.values_list('name', flat=True)), ['comment_created'])
+        self.assertEqual(mail.outbox, [])
+
+        out = StringIO()
+        call_command('runworker', '--once', stdout=out)
+        self.assertIn("Processed 1 job(s).", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Please look", mail.outbox[0].body)
+        self.assertFalse(Job.objects.exists())
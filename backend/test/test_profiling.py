@@ -0,0 +1,119 @@
+import os
+import pstats
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import override_settings
+
+from .base import ApiTestCase
+
+
+class ProfilingTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.profile_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        settings_override = override_settings(PROFILE_DIR=str(self.profile_dir))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.admin = self.login(self.create_user(role="Admin").email)
+        self.user = self.login(self.register())
+
+    def profiled(self, tokens, path="/tasks/"):
+        return self.request("get", path, tokens=tokens, HTTP_X_PROFILE="1")
+
+    def stored(self):
+        return sorted(p.name for p in self.profile_dir.iterdir())
+
+    def test_admin_header_profiles_the_request(self):
+        r = self.profiled(self.admin)
+        self.assertEqual(r.status_code, 200)
+        profile_id = r["X-Profile-Id"]
+        self.assertEqual(self.stored(), [f"{profile_id}.json", f"{profile_id}.prof"])
+
+        r = self.request("get", "/profiles/", tokens=self.admin)
+        self.assertEqual(r.status_code, 200)
+        [summary] = r.json()
+        self.assertEqual(summary["id"], profile_id)
+        self.assertEqual(summary["path"], "/tasks/")
+        self.assertEqual(summary["user"], self.admin["user_id"])
+        self.assertIs(summary["sampled"], False)
+        self.assertGreater(summary["queries"], 0)
+        for field in ("total_ms", "db_ms", "serializer_ms"):
+            self.assertGreaterEqual(summary[field], 0)
+
+    def test_query_param_triggers_too(self):
+        r = self.request("get", "/tasks/?profile=1", tokens=self.admin)
+        self.assertIn("X-Profile-Id", r)
+
+    def test_false_values_do_not_trigger(self):
+        cases = (("/tasks/?profile=0", {}), ("/tasks/?profile=false", {}), ("/tasks/", {"HTTP_X_PROFILE": "0"}))
+        for path, headers in cases:
+            with self.subTest(path=path, headers=headers):
+                r = self.request("get", path, tokens=self.admin, **headers)
+                self.assertNotIn("X-Profile-Id", r)
+        self.assertEqual(self.stored(), [])
+
+    def test_cached_lists_are_profiled_uncached(self):
+        self.request("get", "/tasks/", tokens=self.admin)
+        self.profiled(self.admin)
+        [summary] = self.request("get", "/profiles/", tokens=self.admin).json()
+        self.assertGreater(summary["queries"], 0)
+
+    def test_busy_profiler_skips_profiling(self):
+        with mock.patch("cProfile.Profile.enable", side_effect=ValueError("Another profiling tool is already active")):
+            r = self.profiled(self.admin)
+        self.assertEqual(r.status_code, 200)
+        self.assertNotIn("X-Profile-Id", r)
+        self.assertEqual(self.stored(), [])
+
+    def test_download(self):
+        profile_id = self.profiled(self.admin)["X-Profile-Id"]
+        r = self.request("get", f"/profiles/{profile_id}/", tokens=self.admin)
+        self.assertEqual(r.status_code, 200)
+        self.assertIn(f"{profile_id}.prof", r["Content-Disposition"])
+        download = self.profile_dir / "download.prof"
+        download.write_bytes(b"".join(r.streaming_content))
+        self.assertTrue(pstats.Stats(str(download)).stats)
+
+        for missing in ("0" * 32, "not-a-uuid"):
+            with self.subTest(profile_id=missing):
+                self.assertEqual(self.request("get", f"/profiles/{missing}/", tokens=self.admin).status_code, 404)
+
+    def test_non_admins_are_not_profiled(self):
+        r = self.profiled(self.user)
+        self.assertEqual(r.status_code, 200)
+        self.assertNotIn("X-Profile-Id", r)
+        self.assertEqual(self.stored(), [])
+
+        self.assertEqual(self.request("get", "/profiles/", tokens=self.user).status_code, 403)
+        profile_id = self.profiled(self.admin)["X-Profile-Id"]
+        self.assertEqual(self.request("get", f"/profiles/{profile_id}/", tokens=self.user).status_code, 403)
+
+    def test_untriggered_requests_are_not_profiled(self):
+        r = self.request("get", "/tasks/", tokens=self.admin)
+        self.assertNotIn("X-Profile-Id", r)
+        self.assertEqual(self.stored(), [])
+
+    @override_settings(PROFILE_KEEP=2)
+    def test_only_the_newest_are_kept(self):
+        ids = []
+        for age in (30, 20, 10):
+            ids.append(self.profiled(self.admin)["X-Profile-Id"])
+            # Back-date the files so the order does not depend on the filesystem's mtime resolution.
+            for path in self.profile_dir.glob(f"{ids[-1]}.*"):
+                stamp = path.stat().st_mtime - age
+                os.utime(path, (stamp, stamp))
+        self.assertEqual(self.stored(), sorted(f"{i}.{ext}" for i in ids[1:] for ext in ("json", "prof")))
+        listed = [p["id"] for p in self.request("get", "/profiles/", tokens=self.admin).json()]
+        self.assertEqual(listed, ids[:0:-1])
+
+    @override_settings(PROFILE_SAMPLE_RATE=1.0)
+    def test_sampled_requests_are_stored_without_a_header(self):
+        r = self.request("get", "/tasks/", tokens=self.user)
+        self.assertNotIn("X-Profile-Id", r)
+        [summary] = self.request("get", "/profiles/", tokens=self.admin).json()
+        self.assertEqual(summary["user"], self.user["user_id"])
+        self.assertIs(summary["sampled"], True)
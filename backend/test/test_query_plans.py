@@ -0,0 +1,232 @@
+"""
+Query plan regression checks for the querysets built by src/views.py.
+
+A large dataset is seeded and ANALYZEd, then EXPLAIN output is captured for the queryset each
+view would run and the harness asserts which index (if any) the planner uses and, for paginated
+lists, that the ORDER BY needs no separate sort. Row estimates are only asserted on PostgreSQL;
+SQLite's EXPLAIN QUERY PLAN does not report them.
+
+    python manage.py test test.test_query_plans --settings=backend.settings_test
+    TEST_POSTGRES_URL=postgres://localhost/credes python manage.py test test.test_query_plans \
+        --settings=backend.settings_test
+"""
+import json
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from src.models import Comment, Task, User
+from src.views import CommentListCreateView, TaskListCreateView, UserListView
+
+ALIASES = [alias for alias in ('default', 'postgres') if alias in settings.DATABASES]
+PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
+
+N_ADMINS = 20
+N_USERS = 2000
+TASKS_PER_USER = 10
+COMMENTS_PER_TASK = 2
+
+TASK_PK = {'sqlite': 'ROWID', 'postgresql': 'src_task_pkey'}
+USER_PK = {'sqlite': 'PRIMARY KEY', 'postgresql': 'src_user_pkey'}
+
+SQLITE_ACCESS = re.compile(r'\b(SCAN|SEARCH) (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+)| USING (INTEGER PRIMARY KEY))?')
+SQLITE_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+POSTGRES_INDEX_NODES = {'Index Scan', 'Index Only Scan', 'Bitmap Index Scan'}
+POSTGRES_SORT_NODES = {'Sort', 'Incremental Sort'}
+
+
+def seed(alias):
+    statuses = [choice for choice, _ in Task.Status.choices]
+    users = User.objects.using(alias).bulk_create(
+        [User(email=f'admin{i}@plans.test', full_name='Admin', role='Admin', password='!') for i in range(N_ADMINS)]
+        + [User(email=f'user{i}@plans.test', full_name='User', role='User', password='!') for i in range(N_USERS)]
+    )
+    tasks = Task.objects.using(alias).bulk_create(
+        Task(title=f'Task {i}', status=statuses[i % len(statuses)], assigned_to=users[N_ADMINS + i % N_USERS])
+        for i in range(N_USERS * TASKS_PER_USER)
+    )
+    # bulk_create skips Comment.save(), which assigns the thread path, so ids and paths are set up front.
+    Comment.objects.using(alias).bulk_create(
+        Comment(pk=i, task=tasks[i % len(tasks)], author=users[0], text='Seeded',
+                path=f'{i:0{Comment.PATH_SEGMENT_DIGITS}d}')
+        for i in range(1, len(tasks) * COMMENTS_PER_TASK + 1)
+    )
+    with connections[alias].cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def view_queryset(view_class, user, params=None, **kwargs):
+    request = Request(APIRequestFactory().get('/', params or {}))
+    request.user = user
+    view = view_class(request=request, args=(), kwargs=kwargs, format_kwarg=None)
+    return view.filter_queryset(view.get_queryset())
+
+
+def plan_accesses(queryset, alias):
+    """Return (relation, index name or None, estimated rows or None) for every table access in the plan.
+
+    On SQLite a rowid lookup is reported as 'PRIMARY KEY' and a plain SCAN, which walks the table's own
+    b-tree in id order, as 'ROWID'.
+    """
+    vendor = connections[alias].vendor
+    if vendor == 'sqlite':
+        accesses = []
+        for match in SQLITE_ACCESS.finditer(queryset.explain()):
+            kind, relation, index, integer_pk = match.groups()
+            if index is None:
+                index = 'PRIMARY KEY' if integer_pk or kind == 'SEARCH' else 'ROWID'
+            accesses.append((relation, index, None))
+        return accesses
+    if vendor == 'postgresql':
+        accesses = []
+        stack = [json.loads(queryset.explain(format='json'))[0]['Plan']]
+        while stack:
+            node = stack.pop()
+            if node['Node Type'] == 'Seq Scan':
+                accesses.append((node['Relation Name'], None, node['Plan Rows']))
+            elif node['Node Type'] in POSTGRES_INDEX_NODES:
+                relation = node.get('Relation Name') or index_table(alias, node['Index Name'])
+                accesses.append((relation, node['Index Name'], node['Plan Rows']))
+            stack.extend(node.get('Plans', []))
+        return accesses
+    raise NotImplementedError(f'No plan parser for {vendor}')
+
+
+def plan_sorts(queryset, alias):
+    """Whether the plan sorts rows itself rather than reading them in order from an index."""
+    vendor = connections[alias].vendor
+    if vendor == 'sqlite':
+        return SQLITE_SORT in queryset.explain()
+    if vendor == 'postgresql':
+        stack = [json.loads(queryset.explain(format='json'))[0]['Plan']]
+        while stack:
+            node = stack.pop()
+            if node['Node Type'] in POSTGRES_SORT_NODES:
+                return True
+            stack.extend(node.get('Plans', []))
+        return False
+    raise NotImplementedError(f'No plan parser for {vendor}')
+
+
+def index_table(alias, index_name):
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT tablename FROM pg_indexes WHERE indexname = %s', [index_name])
+        return cursor.fetchone()[0]
+
+
+class QueryPlanTests(TestCase):
+    databases = set(ALIASES)
+
+    @classmethod
+    def setUpTestData(cls):
+        for alias in ALIASES:
+            seed(alias)
+        cls.admin = User.objects.filter(role='Admin').first()
+        cls.user = User.objects.filter(role='User').first()
+        cls.task = Task.objects.filter(assigned_to=cls.user).first()
+
+    def assertPlan(self, queryset, relation, index=None, max_rows=None, presorted=False):
+        """Check how `relation` is read.
+
+        `index` is a substring of the index name the planner must use, None if a scan is acceptable,
+        or a dict of either keyed by database vendor. With `presorted` the plan may not sort the rows.
+        """
+        for alias in ALIASES:
+            with self.subTest(alias=alias):
+                vendor = connections[alias].vendor
+                expected = index.get(vendor) if isinstance(index, dict) else index
+                accesses = [a for a in plan_accesses(queryset.using(alias), alias) if a[0] == relation]
+                self.assertTrue(accesses, f'{relation} missing from plan on {alias}')
+                if expected is not None:
+                    used = [name for _, name, _ in accesses if name]
+                    self.assertTrue(
+                        any(expected in name for name in used),
+                        f'{relation} not read through an index matching {expected!r} on {alias}: {accesses}',
+                    )
+                if presorted:
+                    self.assertFalse(plan_sorts(queryset.using(alias), alias), f'plan sorts rows on {alias}')
+                if max_rows is not None and vendor == 'postgresql':
+                    for _, _, rows in accesses:
+                        self.assertLessEqual(rows, max_rows, f'row estimate regressed on {alias}: {accesses}')
+
+    def test_task_list_user(self):
+        queryset = view_queryset(TaskListCreateView, self.user)
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_task', index='assigned_to', max_rows=TASKS_PER_USER * 5)
+
+    def test_task_list_user_status_filter(self):
+        queryset = view_queryset(TaskListCreateView, self.user, {'status': 'Done'})
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_task', index='assigned_to', max_rows=TASKS_PER_USER * 5)
+
+    def test_task_list_admin(self):
+        # The default ORDER BY id LIMIT n reads the first page straight off the primary key.
+        queryset = view_queryset(TaskListCreateView, self.admin)
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_task', index=TASK_PK, presorted=True)
+
+    def test_task_list_admin_assigned_to_filter(self):
+        queryset = view_queryset(TaskListCreateView, self.admin, {'assigned_to': self.user.pk})
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_task', index='assigned_to', max_rows=TASKS_PER_USER * 5)
+
+    def test_task_list_admin_status_filter(self):
+        # A third of the rows match, so walking the primary key fills a page sooner than a status
+        # index that would then need sorting by id.
+        queryset = view_queryset(TaskListCreateView, self.admin, {'status': 'Done'})
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_task', index=TASK_PK, presorted=True)
+
+    def test_comment_list(self):
+        queryset = view_queryset(CommentListCreateView, self.admin, task_id=self.task.pk)
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_comment', index='comment_task_path_idx',
+                        max_rows=COMMENTS_PER_TASK * 5)
+
+    def test_user_list_filtered(self):
+        queryset = view_queryset(UserListView, self.admin, {'role': 'Admin', 'is_active': 'true'})
+        # sqlite_stat1 only knows the average rows per role (half the table), so with ORDER BY id LIMIT n
+        # SQLite rightly prefers walking the rowid; PostgreSQL sees the skew and must use the index.
+        self.assertPlan(
+            queryset[:PAGE_SIZE], 'src_user',
+            index={'postgresql': 'user_role_active_idx'}, max_rows=N_ADMINS * 5,
+        )
+
+    def test_soft_delete_lookup(self):
+        self.assertPlan(User.objects.filter(pk=self.user.pk), 'src_user', index=USER_PK, max_rows=1)
+
+    def test_soft_delete_reassign(self):
+        # The set-based reassignment UPDATE selects the deactivated users' tasks through this filter.
+        self.assertPlan(Task.objects.filter(assigned_to__in=[self.user.pk]), 'src_task', index='assigned_to',
+                        max_rows=TASKS_PER_USER * 5)
+
+    def test_task_list_admin_ordering(self):
+        queryset = view_queryset(TaskListCreateView, self.admin, {'ordering': '-created_at'})
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_task', index='task_created_idx')
+
+    def test_task_list_admin_status_ordering(self):
+        queryset = view_queryset(TaskListCreateView, self.admin, {'status': 'Done', 'ordering': '-updated_at'})
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_task', index='task_status_updated_idx')
+
+    def test_task_list_user_ordering(self):
+        queryset = view_queryset(TaskListCreateView, self.user, {'ordering': '-created_at'})
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_task', index='task_assigned_to_created_idx',
+                        max_rows=TASKS_PER_USER * 5)
+
+    def test_task_list_admin_assigned_to_in_range(self):
+        queryset = view_queryset(TaskListCreateView, self.admin, {
+            'assigned_to__in': f'{self.user.pk},{self.user.pk + 1}',
+            'created_at_after': '2000-01-01T00:00:00Z',
+            'ordering': 'created_at',
+        })
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_task', index='task_assigned_to_created_idx',
+                        max_rows=TASKS_PER_USER * 10)
+
+    def test_comment_top_level(self):
+        queryset = view_queryset(CommentListCreateView, self.admin, {'top_level': '1'}, task_id=self.task.pk)
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_comment', index='comment_task_parent_idx',
+                        max_rows=COMMENTS_PER_TASK * 5)
+
+    def test_comment_thread(self):
+        root = Comment.objects.filter(task=self.task).first()
+        queryset = view_queryset(CommentListCreateView, self.admin, {'thread': root.pk}, task_id=self.task.pk)
+        self.assertPlan(queryset[:PAGE_SIZE], 'src_comment', index='comment_task_path_idx',
+                        max_rows=COMMENTS_PER_TASK * 5)
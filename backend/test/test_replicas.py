@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from src import metrics
+from src.cache import RESPONSE_CACHE_TIMEOUT
+from src.models import Task
+
+from .base import ApiTransactionTestCase
+
+
+@override_settings(
+    DATABASE_ROUTERS=['src.routers.ReplicaRouter'],
+    REPLICA_DATABASES=['replica_0'],
+    MIDDLEWARE=settings.MIDDLEWARE + ['src.routers.ReplicaPinMiddleware'],
+)
+class ReplicaRoutingTests(ApiTransactionTestCase):
+    # The mirror is a second connection, which only sees committed rows.
+    databases = {'default', 'replica_0'}
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.login(self.create_user(role="Admin").email)
+        self.user = self.login(self.register())
+        self.task = Task.objects.create(title="Routed", assigned_to_id=self.user["user_id"])
+
+    def counters_after(self, method, path, data=None, tokens=None):
+        before = metrics.snapshot()
+        r = self.request(method, path, data, tokens=tokens)
+        after = metrics.snapshot()
+        return r, {name: after[name] - before.get(name, 0) for name in after}
+
+    def test_list_reads_go_to_the_replica(self):
+        with CaptureQueriesContext(connections['replica_0']) as replica, \
+                CaptureQueriesContext(connections['default']) as primary:
+            r, delta = self.counters_after("get", "/tasks/", tokens=self.user)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["count"], 1)
+        self.assertGreater(delta.get("db.read.replica", 0), 0)
+        self.assertTrue(any("src_task" in q["sql"] for q in replica))
+        # Only authentication, which runs before the view opts in, reads the primary.
+        self.assertFalse(any("src_task" in q["sql"] for q in primary))
+
+    def test_writes_pin_the_user_to_the_primary(self):
+        r, delta = self.counters_after("patch", f"/tasks/{self.task.pk}/", {"status": "Done"}, tokens=self.user)
+        self.assertEqual(r.status_code, 200)
+        self.assertGreater(delta.get("db.write.primary", 0), 0)
+
+        r, delta = self.counters_after("get", "/tasks/?status=Done", tokens=self.user)
+        self.assertEqual(r.json()["count"], 1)
+        self.assertEqual(delta.get("db.read.pinned"), 1)
+        self.assertEqual(delta.get("db.read.replica", 0), 0)
+
+        # Other users are not pinned by someone else's write.
+        r, delta = self.counters_after("get", "/tasks/", tokens=self.admin)
+        self.assertGreater(delta.get("db.read.replica", 0), 0)
+
+    def stored_page_timeouts(self, tokens):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.request("get", "/tasks/", tokens=tokens)
+        return [c.args[2] for c in cache_set.call_args_list if c.args[0].startswith('list:')]
+
+    def test_pages_read_from_a_replica_are_cached_briefly(self):
+        self.assertEqual(self.stored_page_timeouts(self.admin), [settings.REPLICA_PIN_SECONDS])
+        self.request("patch", f"/tasks/{self.task.pk}/", {"status": "Done"}, tokens=self.user)
+        # The writer is pinned to the primary, which is never behind.
+        self.assertEqual(self.stored_page_timeouts(self.user), [RESPONSE_CACHE_TIMEOUT])
+
+    def test_metrics_endpoint_counts_both(self):
+        self.request("get", "/tasks/", tokens=self.user)
+        self.request("patch", f"/tasks/{self.task.pk}/", {"status": "Done"}, tokens=self.user)
+        r = self.request("get", "/metrics/", tokens=self.admin)
+        self.assertEqual(r.status_code, 200)
+        self.assertGreater(r.json()["db.read.replica"], 0)
+        self.assertGreater(r.json()["db.write.primary"], 0)
@@ -0,0 +1,136 @@
+from django.test import override_settings
+
+from src.models import Task, User
+
+from .base import ApiTestCase
+
+
+class BulkSoftDeleteTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.login(self.create_user(role="Admin").email)
+        self.users = [self.create_user() for _ in range(3)]
+        self.target = self.login(self.register())
+
+    def bulk(self, data, tokens=None):
+        return self.request("patch", "/users/soft-delete/", data, tokens=tokens or self.admin)
+
+    def create_task(self, assignee_id):
+        r = self.request("post", "/tasks/", {"title": "Owned", "assigned_to": assignee_id}, tokens=self.admin)
+        self.assertEqual(r.status_code, 201, r.content)
+        return r.json()["id"]
+
+    def test_reports_deactivated_already_inactive_and_not_found(self):
+        active, inactive, _ = self.users
+        User.objects.filter(pk=inactive.pk).update(is_active=False)
+        r = self.bulk({"ids": [active.pk, inactive.pk, 999999, active.pk]})
+        self.assertEqual(r.status_code, 200, r.content)
+        self.assertEqual(r.json(), {"deactivated": [active.pk], "already_inactive": [inactive.pk],
+                                    "not_found": [999999]})
+        self.assertFalse(User.objects.get(pk=active.pk).is_active)
+        self.assertTrue(User.objects.get(pk=self.users[2].pk).is_active)
+
+    def test_nothing_to_deactivate(self):
+        r = self.bulk({"ids": [999999]})
+        self.assertEqual(r.status_code, 200, r.content)
+        self.assertEqual(r.json(), {"deactivated": [], "already_inactive": [], "not_found": [999999]})
+
+    def test_reassign_to_moves_every_task(self):
+        tasks = [self.create_task(user.pk) for user in self.users[:2] for _ in range(2)]
+        # Warm the target's list cache so a stale page would show up below.
+        self.assertEqual(self.request("get", "/tasks/", tokens=self.target).json()["count"], 0)
+
+        r = self.bulk({"ids": [u.pk for u in self.users[:2]], "reassign_to": self.target["user_id"]})
+        self.assertEqual(r.status_code, 200, r.content)
+        self.assertEqual(r.json()["tasks_reassigned"], len(tasks))
+        self.assertEqual(set(Task.objects.filter(pk__in=tasks).values_list("assigned_to", flat=True)),
+                         {self.target["user_id"]})
+        r = self.request("get", "/tasks/", tokens=self.target)
+        self.assertEqual(sorted(t["id"] for t in r.json()["results"]), sorted(tasks))
+
+    def test_without_reassign_to_tasks_stay_put(self):
+        task_id = self.create_task(self.users[0].pk)
+        r = self.bulk({"ids": [self.users[0].pk]})
+        self.assertNotIn("tasks_reassigned", r.json())
+        self.assertEqual(Task.objects.get(pk=task_id).assigned_to_id, self.users[0].pk)
+        r = self.request("get", f"/tasks/{task_id}/", tokens=self.admin)
+        self.assertIs(r.json()["assigned_to_inactive"], True)
+
+    def test_invalid_reassign_to(self):
+        inactive = self.create_user()
+        User.objects.filter(pk=inactive.pk).update(is_active=False)
+        ids = [self.users[0].pk]
+        for reassign_to in (inactive.pk, self.users[0].pk, 999999, 2 ** 70, True, "abc"):
+            with self.subTest(reassign_to=reassign_to):
+                r = self.bulk({"ids": ids, "reassign_to": reassign_to})
+                self.assertEqual(r.status_code, 400, r.content)
+                self.assertIn("reassign_to", r.json())
+        self.assertTrue(User.objects.get(pk=self.users[0].pk).is_active)
+
+    def test_invalid_ids(self):
+        for ids in (None, [], [True], [self.users[0].pk, False], ["1"], [1.5], [0], [2 ** 70], "1,2"):
+            with self.subTest(ids=ids):
+                r = self.bulk({"ids": ids})
+                self.assertEqual(r.status_code, 400, r.content)
+                self.assertIn("ids", r.json())
+        self.assertEqual(User.objects.filter(is_active=False).count(), 0)
+
+    def test_body_must_be_an_object(self):
+        for body in ([self.users[0].pk], "x", 1):
+            with self.subTest(body=body):
+                self.assertEqual(self.bulk(body).status_code, 400)
+        self.assertTrue(User.objects.get(pk=self.users[0].pk).is_active)
+
+    @override_settings(USER_BULK_SOFT_DELETE_MAX_IDS=2)
+    def test_too_many_ids(self):
+        r = self.bulk({"ids": [u.pk for u in self.users]})
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("ids", r.json())
+
+    def test_cannot_include_yourself(self):
+        r = self.bulk({"ids": [self.users[0].pk, self.admin["user_id"]]})
+        self.assertEqual(r.status_code, 403)
+        self.assertTrue(User.objects.get(pk=self.users[0].pk).is_active)
+
+    def test_admin_only(self):
+        r = self.bulk({"ids": [self.users[0].pk]}, tokens=self.target)
+        self.assertEqual(r.status_code, 403)
+
+
+class SoftDeleteReassignTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.login(self.create_user(role="Admin").email)
+        self.user = self.login(self.register())
+        self.target = self.login(self.register())
+
+    def test_reassign_to(self):
+        r = self.request("post", "/tasks/", {"title": "Moving", "assigned_to": self.user["user_id"]},
+                         tokens=self.admin)
+        task_id = r.json()["id"]
+        r = self.request("patch", f"/users/{self.user['user_id']}/soft-delete/",
+                         {"reassign_to": self.target["user_id"]}, tokens=self.admin)
+        self.assertEqual(r.status_code, 200, r.content)
+        self.assertEqual(r.json()["tasks_reassigned"], 1)
+        self.assertIs(r.json()["is_active"], False)
+        r = self.request("get", f"/tasks/{task_id}/", tokens=self.target)
+        self.assertEqual(r.json()["assigned_to"], self.target["user_id"])
+        self.assertIs(r.json()["assigned_to_inactive"], False)
+
+    def test_cannot_reassign_to_the_deleted_user(self):
+        r = self.request("patch", f"/users/{self.user['user_id']}/soft-delete/",
+                         {"reassign_to": self.user["user_id"]}, tokens=self.admin)
+        self.assertEqual(r.status_code, 400)
+        self.assertTrue(User.objects.get(pk=self.user["user_id"]).is_active)
+
+    def test_body_must_be_an_object(self):
+        for body in ([self.target["user_id"]], "x"):
+            with self.subTest(body=body):
+                r = self.request("patch", f"/users/{self.user['user_id']}/soft-delete/", body, tokens=self.admin)
+                self.assertEqual(r.status_code, 400)
+        self.assertTrue(User.objects.get(pk=self.user["user_id"]).is_active)
+
+    def test_already_inactive(self):
+        self.request("patch", f"/users/{self.user['user_id']}/soft-delete/", tokens=self.admin)
+        r = self.request("patch", f"/users/{self.user['user_id']}/soft-delete/", tokens=self.admin)
+        self.assertEqual(r.status_code, 400)
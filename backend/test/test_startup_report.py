@@ -0,0 +1,11 @@
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+
+class StartupReportTests(SimpleTestCase):
+    def test_failed_cold_start_is_an_error(self):
+        with mock.patch('src.management.commands.startup_report.COLD_START', 'raise SystemExit("boom")'):
+            with self.assertRaisesMessage(CommandError, 'boom'):
+                call_command('startup_report')
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory
+
+from src.throttling import LoginRateThrottle, clear_local_throttle_state
+
+from .base import ApiTestCase
+
+RATES = {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'login': '3/min', 'list': '2/min', 'list.Admin': '4/min'}
+THROTTLED = override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES})
+
+
+@THROTTLED
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        clear_local_throttle_state()
+        self.request = APIRequestFactory().post('/auth/login/', REMOTE_ADDR='10.0.0.1')
+        self.request.user = None
+
+    def allowed_at(self, seconds):
+        with mock.patch('src.throttling.time.time', return_value=seconds):
+            throttle = LoginRateThrottle()
+            return throttle.allow_request(self.request, None), throttle.wait()
+
+    def test_burst_then_refill(self):
+        self.assertEqual([self.allowed_at(1000)[0] for _ in range(4)], [True, True, True, False])
+        allowed, wait = self.allowed_at(1000)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 20)
+        # One token comes back every 60s / 3.
+        self.assertFalse(self.allowed_at(1019)[0])
+        self.assertTrue(self.allowed_at(1020)[0])
+        self.assertFalse(self.allowed_at(1020)[0])
+
+    def test_no_second_burst_at_a_window_boundary(self):
+        # A fixed window starting at 1020 would allow 3 more here.
+        self.assertEqual([self.allowed_at(1019.9)[0] for _ in range(3)], [True, True, True])
+        self.assertFalse(self.allowed_at(1020.1)[0])
+
+    def test_repeat_denials_skip_the_cache(self):
+        for _ in range(4):
+            self.allowed_at(1000)
+        with mock.patch('src.throttling.cache') as shared:
+            allowed, wait = self.allowed_at(1010)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 10)
+        self.assertEqual(shared.method_calls, [])
+        # Once the local denial runs out the shared bucket decides again.
+        self.assertTrue(self.allowed_at(1020)[0])
+
+    def test_idle_bucket_refills_to_the_limit_only(self):
+        self.assertTrue(self.allowed_at(1000)[0])
+        self.assertEqual([self.allowed_at(5000)[0] for _ in range(4)], [True, True, True, False])
+
+
+@THROTTLED
+class ThrottledEndpointTests(ApiTestCase):
+    def test_login_returns_429_after_the_limit(self):
+        email = self.create_user().email
+        for _ in range(3):
+            self.assertEqual(self.request("post", "/auth/login/", {"email": email, "password": "wrong"}).status_code,
+                             401)
+        r = self.request("post", "/auth/login/", {"email": email, "password": "wrong"})
+        self.assertEqual(r.status_code, 429)
+        self.assertIn("Retry-After", r)
+
+    def test_list_rate_is_per_role(self):
+        user = self.login(self.register())
+        admin = self.login(self.create_user(role="Admin").email)
+        self.assertEqual([self.request("get", "/tasks/", tokens=user).status_code for _ in range(3)], [200, 200, 429])
+        self.assertEqual([self.request("get", "/tasks/", tokens=admin).status_code for _ in range(5)],
+                         [200, 200, 200, 200, 429])